@@ -0,0 +1,23 @@
+from typing import Callable, Dict, NamedTuple, Tuple
+
+
+class Case(NamedTuple):
+    setup: Callable[[], Tuple[Callable[[], None], int]]
+    number: int
+
+
+BENCHMARKS: Dict[str, Case] = {}
+
+
+def benchmark(name: str, number: int = 10000):
+    """
+    Register a benchmark
+
+    The decorated function prepares the benchmark and returns (func, operations),
+    `func` is timed and `operations` is the number of operations it performs per call.
+    """
+    def decorator(setup):
+        BENCHMARKS[name] = Case(setup, number)
+        return setup
+
+    return decorator
@@ -0,0 +1,48 @@
+import subprocess
+import sys
+
+from . import benchmark
+
+# absolute budget of `import pyvjoystick.vigem, pyvjoystick.vjoy`, interpreter start up excluded
+IMPORT_BUDGET_MS = 150
+
+# importing the package must not load the drivers nor read the registry, the subprocess
+# exits with an error if it does or if the import is over budget
+_IMPORT = f'''
+import sys, time
+winreg_before = 'winreg' in sys.modules
+start = time.perf_counter()
+import pyvjoystick.vigem, pyvjoystick.vjoy
+elapsed_ms = (time.perf_counter() - start) * 1000
+
+from pyvjoystick.utils import lazy_eval
+errors = []
+if 'pyvjoystick.vigem._bindings' in sys.modules:
+    errors.append('the ViGEm client dll was loaded (pyvjoystick.vigem._bindings imported)')
+if not isinstance(vars(pyvjoystick.vjoy._sdk)['_vj'], lazy_eval):
+    errors.append('the vJoy dll was loaded')
+if 'winreg' in sys.modules and not winreg_before:
+    errors.append('winreg was imported, the registry may have been read')
+if elapsed_ms > {IMPORT_BUDGET_MS}:
+    errors.append(f'import took {{elapsed_ms:.1f}}ms, over the {IMPORT_BUDGET_MS}ms budget')
+if errors:
+    sys.exit('; '.join(errors))
+'''
+
+
+@benchmark('import.vigem_and_vjoy', number=5)
+def import_package():
+    def func():
+        result = subprocess.run([sys.executable, '-c', _IMPORT], capture_output=True, text=True)
+        if result.returncode:
+            raise AssertionError(f'import.vigem_and_vjoy: {result.stderr.strip()}')
+
+    return func, 1
+
+
+@benchmark('import.interpreter_baseline', number=5)
+def interpreter_baseline():
+    def func():
+        subprocess.run([sys.executable, '-c', 'pass'], check=True)
+
+    return func, 1
@@ -0,0 +1,37 @@
+import threading
+
+from pyvjoystick.vigem import XUSB_BUTTON, VX360Gamepad
+
+from . import benchmark
+
+OPERATIONS_PER_THREAD = 2000
+
+
+def _writers(threads: int):
+    gamepad = VX360Gamepad(thread_safe=True)
+    buttons = list(XUSB_BUTTON)
+
+    def writer(button):
+        press = gamepad.press_button
+        release = gamepad.release_button
+        for _ in range(OPERATIONS_PER_THREAD // 2):
+            press(button)
+            release(button)
+
+    def func():
+        workers = [threading.Thread(target=writer, args=(buttons[i % len(buttons)],))
+                   for i in range(threads)]
+        for worker in workers:
+            worker.start()
+        # the flush runs concurrently with the writers
+        for _ in range(OPERATIONS_PER_THREAD // 100):
+            gamepad.update()
+        for worker in workers:
+            worker.join()
+
+    return func, threads * OPERATIONS_PER_THREAD
+
+
+for _threads in (1, 4, 8):
+    benchmark(f'threads.x360_thread_safe_writers_{_threads}', number=20)(
+        lambda threads=_threads: _writers(threads))
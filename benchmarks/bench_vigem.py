@@ -0,0 +1,134 @@
+from pyvjoystick.vigem import (
+    DS4_BUTTONS,
+    DS4_DPAD_DIRECTIONS,
+    XUSB_BUTTON,
+    VDS4Gamepad,
+    VX360Gamepad,
+)
+from pyvjoystick.vigem.constants import DS4_REPORT_EX
+
+from . import benchmark
+
+
+@benchmark('vigem.x360.construct_and_close', number=1000)
+def x360_construct():
+    def func():
+        VX360Gamepad().close()
+
+    return func, 1
+
+
+@benchmark('vigem.x360.press_release_button')
+def x360_buttons():
+    gamepad = VX360Gamepad()
+
+    def func():
+        gamepad.press_button(XUSB_BUTTON.XUSB_GAMEPAD_A)
+        gamepad.release_button(XUSB_BUTTON.XUSB_GAMEPAD_A)
+
+    return func, 2
+
+
+@benchmark('vigem.x360.joystick_float')
+def x360_joystick():
+    gamepad = VX360Gamepad()
+
+    def func():
+        gamepad.left_joystick_float(0.5, -0.25)
+
+    return func, 1
+
+
+@benchmark('vigem.x360.update')
+def x360_update():
+    gamepad = VX360Gamepad()
+
+    def func():
+        gamepad.update()
+
+    return func, 1
+
+
+@benchmark('vigem.ds4.construct_and_close', number=1000)
+def ds4_construct():
+    def func():
+        VDS4Gamepad().close()
+
+    return func, 1
+
+
+@benchmark('vigem.ds4.press_release_button')
+def ds4_buttons():
+    gamepad = VDS4Gamepad()
+
+    def func():
+        gamepad.press_button(DS4_BUTTONS.DS4_BUTTON_CROSS)
+        gamepad.release_button(DS4_BUTTONS.DS4_BUTTON_CROSS)
+
+    return func, 2
+
+
+@benchmark('vigem.ds4.joystick_float')
+def ds4_joystick():
+    gamepad = VDS4Gamepad()
+
+    def func():
+        gamepad.left_joystick_float(0.5, -0.25)
+
+    return func, 1
+
+
+@benchmark('vigem.ds4.directional_pad')
+def ds4_dpad():
+    gamepad = VDS4Gamepad()
+
+    def func():
+        gamepad.directional_pad(DS4_DPAD_DIRECTIONS.DS4_BUTTON_DPAD_NORTHWEST)
+
+    return func, 1
+
+
+@benchmark('vigem.ds4.update')
+def ds4_update():
+    gamepad = VDS4Gamepad()
+
+    def func():
+        gamepad.update()
+
+    return func, 1
+
+
+@benchmark('vigem.ds4.report_ex_build_and_update')
+def ds4_report_ex():
+    gamepad = VDS4Gamepad()
+
+    def func():
+        report = DS4_REPORT_EX()
+        sub = report.Report
+        sub.bThumbLX = sub.bThumbLY = sub.bThumbRX = sub.bThumbRY = 0x80
+        sub.wButtons = DS4_DPAD_DIRECTIONS.DS4_BUTTON_DPAD_NONE
+        sub.wGyroX = 100
+        sub.wAccelZ = -100
+        gamepad.update_extended_report(report)
+
+    return func, 1
+
+
+@benchmark('vigem.notification_dispatch')
+def notification_dispatch():
+    gamepad = VX360Gamepad()
+    received = []
+
+    def callback(client, target, large_motor, small_motor, led_number, user_data):
+        received.append(large_motor)
+
+    gamepad.register_notification(callback)
+    trampoline = gamepad._callback_func
+
+    def func():
+        # two different states, identical consecutive notifications are dropped
+        trampoline(None, None, 10, 20, 1, None)
+        trampoline(None, None, 20, 10, 1, None)
+        received.clear()
+
+    return func, 2
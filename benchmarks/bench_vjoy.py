@@ -0,0 +1,83 @@
+from pyvjoystick.vjoy import HID_USAGE, VJoyDevice, _sdk
+
+from . import benchmark
+
+
+@benchmark('vjoy.construct_and_close', number=1000)
+def construct():
+    def func():
+        VJoyDevice(1).close()
+
+    return func, 1
+
+
+@benchmark('vjoy.create_data_structure', number=5000)
+def create_data_structure():
+    def func():
+        _sdk.CreateDataStructure(1)
+
+    return func, 1
+
+
+@benchmark('vjoy.set_axis')
+def set_axis():
+    device = VJoyDevice(1)
+
+    def func():
+        device.set_axis(HID_USAGE.X, 0x4000)
+
+    return func, 1
+
+
+@benchmark('vjoy.set_button')
+def set_button():
+    device = VJoyDevice(1)
+
+    def func():
+        device.set_button(15, 1)
+
+    return func, 1
+
+
+@benchmark('vjoy.update')
+def update():
+    device = VJoyDevice(1)
+    device._data.wAxisX = 0x2000
+
+    def func():
+        device.update()
+
+    return func, 1
+
+
+@benchmark('vjoy.snapshot_restore')
+def snapshot_restore():
+    device = VJoyDevice(1)
+    state = device.snapshot()
+
+    def func():
+        device.restore(state)
+
+    return func, 1
+
+
+@benchmark('vjoy.set_cont_pov_x4')
+def set_cont_pov_x4():
+    device = VJoyDevice(1)
+
+    def func():
+        for pov in range(1, 5):
+            device.set_cont_pov(pov, 9000)
+
+    return func, 4
+
+
+@benchmark('vjoy.set_povs_x4')
+def set_povs_x4():
+    device = VJoyDevice(1)
+    values = (9000, 18000, 27000, -1)
+
+    def func():
+        device.set_povs(values)
+
+    return func, 4
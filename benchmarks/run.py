@@ -0,0 +1,111 @@
+"""
+Benchmark runner
+
+    python -m benchmarks.run                              # run everything, print a table
+    python -m benchmarks.run --json results.json          # also write machine readable results
+    python -m benchmarks.run --compare baseline.json      # exit with status 1 on regressions
+    python -m benchmarks.run -k vigem                     # only benchmarks whose name contains 'vigem'
+
+The drivers are replaced by `benchmarks.stub_driver`, so the suite runs on any platform and
+measures the Python side of the library only.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import timeit
+
+from . import BENCHMARKS, Case, stub_driver
+
+
+def run(name: str, case: Case, repeat: int) -> dict:
+    func, operations = case.setup()
+    timer = timeit.Timer(func)
+    # warm up
+    timer.timeit(max(1, case.number // 10))
+
+    samples = [t / (case.number * operations) * 1e9
+               for t in timer.repeat(repeat=repeat, number=case.number)]
+
+    return {
+        'min_ns': min(samples),
+        'median_ns': statistics.median(samples),
+        'mean_ns': statistics.mean(samples),
+        'stdev_ns': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'number': case.number,
+        'repeat': repeat,
+        'operations': operations,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Return (name, baseline_ns, current_ns, ratio) for the benchmarks slower than baseline * (1 + threshold)"""
+    regressions = []
+    for name, current in results['benchmarks'].items():
+        previous = baseline['benchmarks'].get(name)
+        if previous is None:
+            continue
+
+        ratio = current['median_ns'] / previous['median_ns']
+        if ratio > 1 + threshold:
+            regressions.append(
+                (name, previous['median_ns'], current['median_ns'], ratio))
+
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run')
+    parser.add_argument('-k', dest='filter', default='',
+                        help='only run benchmarks whose name contains this string')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', dest='json_path',
+                        help='write the results to this file')
+    parser.add_argument('--compare', dest='baseline_path',
+                        help='compare against a previous --json output')
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help='allowed slowdown of the median before failing (default 0.15 = 15%%)')
+    args = parser.parse_args(argv)
+
+    stub_driver.install()
+    from . import bench_import, bench_threads, bench_vigem, bench_vjoy  # noqa: F401 (register the benchmarks)
+
+    results = {
+        'machine': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+        },
+        'benchmarks': {},
+    }
+
+    for name, case in BENCHMARKS.items():
+        if args.filter not in name:
+            continue
+
+        result = run(name, case, args.repeat)
+        results['benchmarks'][name] = result
+        print(f'{name:<48} {result["median_ns"]:>12.1f} ns/op  (min {result["min_ns"]:.1f})')
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline_path:
+        with open(args.baseline_path) as f:
+            baseline = json.load(f)
+
+        regressions = compare(results, baseline, args.threshold)
+        for name, previous, current, ratio in regressions:
+            print(f'REGRESSION {name}: {previous:.1f} ns -> {current:.1f} ns ({ratio:.2f}x)')
+
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+Stress test of the bus reconnection and of closing a gamepad while other threads send reports
+
+    python -m benchmarks.stress_reconnect                        # 4 threads, 200 reconnections
+    python -m benchmarks.stress_reconnect --threads 8 --reconnections 1000
+
+The drivers are replaced by `benchmarks.stub_driver`. The client and target handles freed by
+the library are tracked, and every report sent checks its handles before and after yielding to
+the other threads: the script exits with status 1 if a report was sent with a handle that had
+already been freed.
+"""
+import argparse
+import itertools
+import sys
+import threading
+import time
+
+from . import stub_driver
+
+VIGEM_ERROR_NONE = stub_driver.VIGEM_ERROR_NONE
+
+
+class HandleTracker:
+    """Replaces the allocation, free and update functions of the ViGEm SDK"""
+
+    def __init__(self, sdk) -> None:
+        self._clients = itertools.count(1)
+        self.freed_clients = set()
+        self.freed_targets = set()
+        self.sent = 0
+        self.use_after_free = 0
+
+        sdk.vigem_alloc = self.alloc
+        sdk.vigem_free = self.freed_clients.add
+        sdk.vigem_target_free = self.freed_targets.add
+        sdk.vigem_target_x360_update = self.update
+
+    def alloc(self):
+        return next(self._clients)
+
+    def _check(self, client, target) -> None:
+        if client in self.freed_clients or target in self.freed_targets:
+            self.use_after_free += 1
+
+    def update(self, client, target, report):
+        self._check(client, target)
+        # let a reconnection or a close run in the middle of the call
+        time.sleep(0)
+        self._check(client, target)
+        self.sent += 1
+
+        return VIGEM_ERROR_NONE
+
+
+def reconnect_while_sending(threads: int, reconnections: int) -> None:
+    from pyvjoystick.vigem import VX360Gamepad
+    from pyvjoystick.vigem.vbus import VBus
+
+    bus = VBus()
+    gamepads = [VX360Gamepad(bus=bus, thread_safe=True) for _ in range(threads)]
+    stop = threading.Event()
+
+    def send(gamepad):
+        while not stop.is_set():
+            gamepad.update()
+
+    workers = [threading.Thread(target=send, args=(gamepad,)) for gamepad in gamepads]
+    for worker in workers:
+        worker.start()
+
+    try:
+        for _ in range(reconnections):
+            bus.reconnect()
+            time.sleep(0.001)
+    finally:
+        stop.set()
+        for worker in workers:
+            worker.join()
+
+    for gamepad in gamepads:
+        gamepad.close()
+
+
+def close_while_sending(threads: int, closes: int) -> None:
+    from pyvjoystick.vigem import VX360Gamepad
+    from pyvjoystick.vigem.exceptions import ViGemDeviceClosedError
+
+    for _ in range(closes):
+        gamepad = VX360Gamepad(thread_safe=True)
+
+        def send():
+            while True:
+                try:
+                    gamepad.update()
+                except ViGemDeviceClosedError:
+                    return
+
+        workers = [threading.Thread(target=send) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+
+        time.sleep(0.002)
+        gamepad.close()
+        for worker in workers:
+            worker.join()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.stress_reconnect')
+    parser.add_argument('--threads', type=int, default=4,
+                        help='number of threads sending reports')
+    parser.add_argument('--reconnections', type=int, default=200)
+    parser.add_argument('--closes', type=int, default=50,
+                        help='number of gamepads closed while the threads send reports')
+    args = parser.parse_args(argv)
+
+    stub_driver.install()
+    from pyvjoystick.vigem import _sdk
+
+    failed = False
+    for name, func, count in (('reconnect', reconnect_while_sending, args.reconnections),
+                              ('close', close_while_sending, args.closes)):
+        tracker = HandleTracker(_sdk)
+        start = time.perf_counter()
+        func(args.threads, count)
+        elapsed = time.perf_counter() - start
+
+        print(f'{name:<10} {count:>6} x {args.threads} threads  {tracker.sent:>9} reports  '
+              f'{elapsed:6.2f}s  use after free: {tracker.use_after_free}')
+        failed = failed or tracker.use_after_free > 0
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+In-process stand-in for the vJoy and ViGEm drivers
+
+`install()` must be called before the first device is created. It replaces `cdll.LoadLibrary` so that
+loading vJoyInterface.dll or ViGEmClient.dll returns a fake library made of Python functions,
+and provides a fake `winreg` module describing a vJoy 2.2 installation. Everything above the FFI
+boundary (structures, argument handling, error checking) runs unchanged.
+"""
+import ctypes
+import sys
+import types
+from itertools import count
+
+VIGEM_ERROR_NONE = 0x20000000
+VJOY_MAX_DEVICES = 16
+VJOY_AXES = range(0x30, 0x36)
+VJOY_AXIS_MIN = 1
+VJOY_AXIS_MAX = 0x8000
+
+_targets = count(1)
+
+
+def _vigem_functions():
+    return {
+        'vigem_alloc': lambda: 1,
+        'vigem_free': lambda client: None,
+        'vigem_connect': lambda client: VIGEM_ERROR_NONE,
+        'vigem_disconnect': lambda client: None,
+        'vigem_target_x360_alloc': lambda: next(_targets),
+        'vigem_target_ds4_alloc': lambda: next(_targets),
+        'vigem_target_free': lambda target: None,
+        'vigem_target_is_attached': lambda target: True,
+        'vigem_target_get_vid': lambda target: 0x045E,
+        'vigem_target_get_pid': lambda target: 0x028E,
+        'vigem_target_get_index': lambda target: target,
+        'vigem_target_get_type': lambda target: 0,
+        'vigem_target_set_vid': lambda target, vid: None,
+        'vigem_target_set_pid': lambda target, pid: None,
+        'vigem_target_x360_unregister_notification': lambda target: None,
+        'vigem_target_ds4_unregister_notification': lambda target: None,
+    }
+
+
+def _vjoy_functions():
+    def out_param(value):
+        def func(*args):
+            args[-1].contents.value = value
+            return 1
+        return func
+
+    return {
+        'GetNumberExistingVJD': out_param(VJOY_MAX_DEVICES),
+        'GetvJoyMaxDevices': out_param(VJOY_MAX_DEVICES),
+        'GetVJDStatus': lambda rID: 1,  # FREE
+        'GetVJDButtonNumber': lambda rID: 32,
+        'GetVJDDiscPovNumber': lambda rID: 0,
+        'GetVJDContPovNumber': lambda rID: 4,
+        'GetVJDAxisExist': lambda rID, axis: int(axis in VJOY_AXES),
+        'GetVJDAxisMin': out_param(VJOY_AXIS_MIN),
+        'GetVJDAxisMax': out_param(VJOY_AXIS_MAX),
+    }
+
+
+class StubLibrary:
+    """Fake CDLL, unknown functions succeed (return VIGEM_ERROR_NONE or TRUE)"""
+
+    def __init__(self, functions: dict, default_result: int) -> None:
+        self._default_result = default_result
+        for name, func in functions.items():
+            setattr(self, name, self._function(func))
+
+    @staticmethod
+    def _function(func):
+        # a real function object so that argtypes/restype can be assigned
+        def stub(*args):
+            return func(*args)
+        return stub
+
+    def __getattr__(self, name):
+        result = self._default_result
+        func = self._function(lambda *args: result)
+        setattr(self, name, func)
+
+        return func
+
+
+def _fake_winreg():
+    winreg = types.ModuleType('winreg')
+    winreg.HKEY_LOCAL_MACHINE = 0x80000002
+    winreg.HKEYType = object
+
+    values = {
+        'InstallLocation': 'C:\\Program Files\\vJoy',
+        'DllX64Location': 'C:\\Program Files\\vJoy\\x64',
+        'DllX86Location': 'C:\\Program Files\\vJoy\\x86',
+        'DisplayVersion': '2.2.1.1',
+    }
+
+    winreg.ConnectRegistry = lambda computer, key: key
+    winreg.OpenKey = lambda key, sub_key: sub_key
+    winreg.QueryValueEx = lambda key, name: (values[name], 1)
+
+    return winreg
+
+
+def install():
+    """Replace the driver libraries and the registry, call it before any device is created"""
+    if 'pyvjoystick.vigem._bindings' in sys.modules:
+        raise RuntimeError('install() must be called before the SDK is loaded')
+
+    sys.modules['winreg'] = _fake_winreg()
+
+    original_load = ctypes.cdll.LoadLibrary
+
+    def load_library(name):
+        if name.endswith('ViGEmClient.dll'):
+            return StubLibrary(_vigem_functions(), VIGEM_ERROR_NONE)
+        if name.endswith('vJoyInterface.dll'):
+            return StubLibrary(_vjoy_functions(), 1)
+
+        return original_load(name)
+
+    ctypes.cdll.LoadLibrary = load_library
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Union
+
+
+class DeviceSpec:
+    """Description of a device to open: a factory (usually the device class) and its arguments"""
+    __slots__ = ('factory', 'args', 'kwargs')
+
+    def __init__(self, factory: Callable[..., Any], *args, **kwargs) -> None:
+        self.factory = factory
+        self.args = args
+        self.kwargs = kwargs
+
+    def open(self):
+        return self.factory(*self.args, **self.kwargs)
+
+    def __repr__(self) -> str:
+        name = getattr(self.factory, '__name__', repr(self.factory))
+        params = [repr(a) for a in self.args]
+        params.extend(f'{k}={v!r}' for k, v in self.kwargs.items())
+        return f'{self.__class__.__name__}< {name}({", ".join(params)}) >'
+
+
+class DeviceResult:
+    """Outcome of opening a single device"""
+    __slots__ = ('spec', 'device', 'error', 'elapsed')
+
+    def __init__(self, spec: DeviceSpec, device: Any, error: Optional[BaseException], elapsed: float) -> None:
+        self.spec = spec
+        self.device = device
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self) -> str:
+        status = 'ok' if self.error is None else f'error={self.error!r}'
+        return f'{self.__class__.__name__}< {self.spec!r}, {status}, elapsed={self.elapsed:.4f}s >'
+
+
+class DeviceBringUpError(Exception):
+    """Raised by open_devices when at least one device failed to open"""
+
+    def __init__(self, results: List[DeviceResult]) -> None:
+        self.results = results
+        failed = [r for r in results if r.error is not None]
+        details = '; '.join(f'{r.spec!r}: {r.error!r}' for r in failed)
+        super().__init__(
+            f'{len(failed)} of {len(results)} devices failed to open: {details}')
+
+    @property
+    def devices(self) -> list:
+        """The devices that were opened successfully"""
+        return [r.device for r in self.results if r.error is None]
+
+
+def _open(spec: DeviceSpec) -> DeviceResult:
+    start = perf_counter()
+    try:
+        device = spec.open()
+    except Exception as e:
+        return DeviceResult(spec, None, e, perf_counter() - start)
+
+    return DeviceResult(spec, device, None, perf_counter() - start)
+
+
+def _connect_shared_bus(specs: Sequence[DeviceSpec]):
+    """
+    Connect the shared ViGEm bus once, in the calling thread, before gamepads using it
+    are opened concurrently (they would all try to create the connection)
+    """
+    from .vigem.device import VGamepad
+    from .vigem.vbus import VBus
+
+    if not any(isinstance(s.factory, type) and issubclass(s.factory, VGamepad)
+               and s.kwargs.get('bus') is None for s in specs):
+        return
+
+    try:
+        VBus.getVBus().bus_pointer
+    except Exception:
+        # reported by every gamepad in its DeviceResult
+        pass
+
+
+def open_devices(specs: Iterable[Union[DeviceSpec, Callable[[], Any]]],
+                 max_workers: int = None,
+                 raise_on_error: bool = True) -> List[DeviceResult]:
+    """
+    Open several devices concurrently
+
+    The blocking driver calls (AcquireVJD, vigem_target_add, ...) release the GIL,
+    so the total time is bounded by the slowest device instead of the sum of all of them.
+
+    :param specs: DeviceSpec instances, or callables without arguments returning a device
+    :param max_workers: size of the thread pool (default: one thread per device)
+    :param raise_on_error: raise DeviceBringUpError if any device failed to open
+    :return: a DeviceResult per spec, in the same order
+    """
+    specs: Sequence[DeviceSpec] = [
+        s if isinstance(s, DeviceSpec) else DeviceSpec(s) for s in specs]
+
+    if not specs:
+        return []
+
+    if max_workers is None:
+        max_workers = len(specs)
+
+    _connect_shared_bus(specs)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='open_devices') as executor:
+        results = list(executor.map(_open, specs))
+
+    if raise_on_error and any(r.error is not None for r in results):
+        raise DeviceBringUpError(results)
+
+    return results
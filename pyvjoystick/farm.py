@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import pickle
+import queue
+from ctypes import sizeof
+from multiprocessing import shared_memory
+from struct import Struct
+from time import perf_counter
+from typing import Callable, Iterable, List, Sequence, Tuple, Union
+
+from .bringup import DeviceBringUpError, DeviceResult, DeviceSpec
+
+# Shared memory layout, one slot per device:
+#   written     Q   sequence of the report, odd while the controller is writing it (seqlock)
+#   applied     Q   sequence of the last report sent to the device by the worker
+#   report          raw report bytes, SLOT_REPORT_SIZE bytes reserved
+SLOT_HEADER = Struct('=QQ')
+SEQUENCE = Struct('=Q')
+# the worker only writes the applied word, the controller only the written one
+APPLIED_OFFSET = SEQUENCE.size
+
+
+def _report_sizes() -> List[int]:
+    from .vigem.constants import DS4_REPORT, XUSB_REPORT
+    from .vjoy._sdk import _JOYSTICK_POSITION_V3
+
+    return [sizeof(XUSB_REPORT), sizeof(DS4_REPORT), sizeof(_JOYSTICK_POSITION_V3)]
+
+
+# room for the largest report, rounded to 8 bytes
+SLOT_REPORT_SIZE = (max(_report_sizes()) + 7) & ~7
+SLOT_SIZE = SLOT_HEADER.size + SLOT_REPORT_SIZE
+
+
+def _picklable_error(error: BaseException) -> BaseException:
+    try:
+        pickle.dumps(error)
+    except Exception:
+        return RuntimeError(repr(error))
+
+    return error
+
+
+def _worker_main(shm_name: str, shard: Sequence, wake, stop, results):
+    """Entry point of a worker process: opens its devices and applies their reports on every wake up"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    buffer = shm.buf
+    devices = []
+    opened = []
+    for index, factory, args, kwargs in shard:
+        start = perf_counter()
+        try:
+            device = factory(*args, **kwargs)
+        except Exception as e:
+            opened.append((index, _picklable_error(e), perf_counter() - start))
+            continue
+
+        devices.append((index, device, len(device.snapshot())))
+        opened.append((index, None, perf_counter() - start))
+    results.put(opened)
+
+    unpack_from = SLOT_HEADER.unpack_from
+    pack_applied = SEQUENCE.pack_into
+    last = {index: 0 for index, _, _ in devices}
+    try:
+        while True:
+            wake.wait()
+            # cleared before the scan, a report written during it wakes the worker again
+            wake.clear()
+            if stop.is_set():
+                break
+
+            for index, device, size in devices:
+                base = index * SLOT_SIZE
+                while True:
+                    written = unpack_from(buffer, base)[0]
+                    if written == last[index]:
+                        break
+                    if written & 1:
+                        # the controller is writing this slot
+                        continue
+
+                    start = base + SLOT_HEADER.size
+                    data = bytes(buffer[start:start + size])
+                    if unpack_from(buffer, base)[0] != written:
+                        # overwritten while copying, read it again
+                        continue
+
+                    last[index] = written
+                    try:
+                        device.restore(data)
+                        device.update()
+                    except Exception as e:
+                        # the slot stays not applied, the controller gets the error
+                        results.put((index, _picklable_error(e)))
+                        break
+
+                    # only the applied word, the controller may have written a newer report meanwhile
+                    pack_applied(buffer, base + APPLIED_OFFSET, written)
+                    break
+    finally:
+        for _, device, _ in devices:
+            try:
+                device.close()
+            except Exception:
+                pass
+        del buffer
+        shm.close()
+
+
+class DeviceFarm:
+    """
+    Devices (VX360Gamepad, VDS4Gamepad, VJoyDevice, ...) spread over worker processes
+
+    Every worker owns a shard of the devices and sends their reports, so the update throughput
+    scales with the number of cores instead of being bound by the GIL. The controller (this
+    object) writes reports into a shared memory slot per device and wakes the workers owning
+    modified devices; a worker sends only the newest report of each device.
+
+        specs = [DeviceSpec(VX360Gamepad) for _ in range(16)]
+        with DeviceFarm(specs, workers=4) as farm:
+            farm.set_report(0, report)
+            farm.flush()
+
+    Factories and their arguments are sent to the workers, so they must be picklable
+    (e.g. the device classes). On Windows, the farm must be created under
+    `if __name__ == '__main__':`.
+    """
+
+    def __init__(self, specs: Iterable[Union[DeviceSpec, Callable]], workers: int = None,
+                 context: str = None, start_timeout: float = 30.0) -> None:
+        """
+        :param specs: DeviceSpec instances, or picklable callables without arguments returning a device
+        :param workers: number of worker processes (default: the number of cores, at most one per device)
+        :param context: multiprocessing start method ('spawn', 'fork', ...), default: the platform one
+        :param start_timeout: seconds to wait for the workers to open their devices
+        """
+        self._specs: List[DeviceSpec] = [
+            s if isinstance(s, DeviceSpec) else DeviceSpec(s) for s in specs]
+        count = len(self._specs)
+        if count == 0:
+            raise ValueError('No device to open')
+
+        workers = min(workers or os.cpu_count() or 1, count)
+        ctx = multiprocessing.get_context(context)
+
+        self._shm = shared_memory.SharedMemory(create=True, size=count * SLOT_SIZE)
+        self._buffer = self._shm.buf
+        self._buffer[:] = bytes(len(self._buffer))
+        self._sequences = [0] * count
+        # device index -> worker index, round robin
+        self._owner = [index % workers for index in range(count)]
+        self._dirty = set()
+        self._stop = ctx.Event()
+        self._wake = [ctx.Event() for _ in range(workers)]
+        self._processes = []
+        self._closed = False
+
+        self._results = results = ctx.Queue()
+        for worker in range(workers):
+            shard = [(index, spec.factory, spec.args, spec.kwargs)
+                     for index, spec in enumerate(self._specs) if self._owner[index] == worker]
+            process = ctx.Process(
+                target=_worker_main, name=f'DeviceFarm-{worker}', daemon=True,
+                args=(self._shm.name, shard, self._wake[worker], self._stop, results))
+            process.start()
+            self._processes.append(process)
+
+        outcomes = {}
+        try:
+            for _ in range(workers):
+                for index, error, elapsed in results.get(timeout=start_timeout):
+                    outcomes[index] = (error, elapsed)
+        except Exception:
+            self.close()
+            raise
+
+        self.results = [DeviceResult(spec, None, *outcomes[index])
+                        for index, spec in enumerate(self._specs)]
+        if any(r.error is not None for r in self.results):
+            self.close()
+            raise DeviceBringUpError(self.results)
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    @property
+    def workers(self) -> int:
+        return len(self._processes)
+
+    def set_report(self, index: int, report):
+        """
+        Write the report of a device, it is sent on the next `flush`
+
+        :param report: a report structure or its bytes (e.g. device.snapshot() of a local device)
+        """
+        data = bytes(report)
+        if len(data) > SLOT_REPORT_SIZE:
+            raise ValueError(f'Report too large: {len(data)} bytes')
+
+        base = index * SLOT_SIZE
+        sequence = self._sequences[index] + 1
+        buffer = self._buffer
+        # odd while writing, the worker does not read a half written report
+        SEQUENCE.pack_into(buffer, base, sequence)
+        start = base + SLOT_HEADER.size
+        buffer[start:start + len(data)] = data
+        sequence += 1
+        SEQUENCE.pack_into(buffer, base, sequence)
+        self._sequences[index] = sequence
+        self._dirty.add(self._owner[index])
+
+    def flush(self):
+        """Wake the workers owning the devices modified since the last flush"""
+        wake = self._wake
+        for worker in self._dirty:
+            wake[worker].set()
+        self._dirty.clear()
+
+    def update(self, index: int, report):
+        """Write the report of a device and send it right away"""
+        self.set_report(index, report)
+        self.flush()
+
+    def applied(self, index: int) -> bool:
+        """True if the last report written for the device was sent"""
+        written, applied = SLOT_HEADER.unpack_from(self._buffer, index * SLOT_SIZE)
+        return written == applied
+
+    @property
+    def alive(self) -> bool:
+        """False if a worker process exited, its devices are not updated anymore"""
+        return all(process.is_alive() for process in self._processes)
+
+    def errors(self) -> List[Tuple[int, BaseException]]:
+        """
+        Errors raised by the devices while sending reports since the last call
+
+        The report that failed stays not applied, see `applied`.
+
+        :return: (device index, exception) pairs
+        """
+        errors = []
+        while True:
+            try:
+                errors.append(self._results.get_nowait())
+            except queue.Empty:
+                return errors
+
+    def close(self, timeout: float = 5.0):
+        """Stop the workers, which close their devices"""
+        if self._closed:
+            return
+
+        self._closed = True
+        self._stop.set()
+        for wake in self._wake:
+            wake.set()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+
+        self._buffer.release()
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self) -> DeviceFarm:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
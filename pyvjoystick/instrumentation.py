@@ -0,0 +1,279 @@
+import importlib
+import json
+import threading
+from time import perf_counter_ns
+from typing import Callable, Dict, Hashable, Optional
+
+# position of the argument identifying the device (rID or target pointer), None if there is no device
+_VJOY_FUNCTIONS: Dict[str, Optional[int]] = {
+    'GetNumberExistingVJD': None,
+    'GetvJoyMaxDevices': None,
+    'vJoyEnabled': None,
+    'DriverMatch': None,
+    'GetVJDStatus': 0,
+    'AcquireVJD': 0,
+    'RelinquishVJD': 0,
+    'GetVJDButtonNumber': 0,
+    'GetVJDDiscPovNumber': 0,
+    'GetVJDContPovNumber': 0,
+    'GetVJDAxisExist': 0,
+    'GetVJDAxisMax': 0,
+    'GetVJDAxisMin': 0,
+    'SetBtn': 1,
+    'SetAxis': 1,
+    'SetDiscPov': 1,
+    'SetContPov': 1,
+    'ResetVJD': 0,
+    'ResetAll': None,
+    'ResetButtons': 0,
+    'ResetPovs': 0,
+    'UpdateVJD': 0,
+    'GetPosition': 0,
+}
+
+_VIGEM_FUNCTIONS: Dict[str, Optional[int]] = {
+    'vigem_alloc': None,
+    'vigem_free': None,
+    'vigem_connect': None,
+    'vigem_disconnect': None,
+    'vigem_target_x360_alloc': None,
+    'vigem_target_ds4_alloc': None,
+    'vigem_target_free': 0,
+    'vigem_target_add': 1,
+    'vigem_target_remove': 1,
+    'vigem_target_set_vid': 0,
+    'vigem_target_set_pid': 0,
+    'vigem_target_get_vid': 0,
+    'vigem_target_get_pid': 0,
+    'vigem_target_x360_update': 1,
+    'vigem_target_ds4_update': 1,
+    'vigem_target_ds4_update_ex': 1,
+    'vigem_target_get_index': 0,
+    'vigem_target_get_type': 0,
+    'vigem_target_is_attached': 0,
+    'vigem_target_x360_get_user_index': 1,
+    'vigem_target_x360_register_notification': 1,
+    'vigem_target_x360_unregister_notification': 0,
+    'vigem_target_ds4_register_notification': 1,
+    'vigem_target_ds4_unregister_notification': 0,
+}
+
+FAMILIES = {
+    'vjoy': ('pyvjoystick.vjoy._sdk', _VJOY_FUNCTIONS),
+    'vigem': ('pyvjoystick.vigem._sdk', _VIGEM_FUNCTIONS),
+}
+
+# each power of two is split in 2 ** _SUB_BITS linear buckets (~6% relative error)
+_SUB_BITS = 4
+_SUB_COUNT = 1 << _SUB_BITS
+
+
+def _bucket_index(value: int) -> int:
+    if value < _SUB_COUNT:
+        return value
+
+    shift = value.bit_length() - _SUB_BITS - 1
+
+    return (shift + 1) * _SUB_COUNT + (value >> shift) - _SUB_COUNT
+
+
+def _bucket_lower_bound(index: int) -> int:
+    if index < _SUB_COUNT:
+        return index
+
+    shift = index // _SUB_COUNT - 1
+
+    return (_SUB_COUNT + index % _SUB_COUNT) << shift
+
+
+class LatencyHistogram:
+    """Log-linear (HDR-style) histogram of latencies in nanoseconds"""
+    __slots__ = ('count', 'total', 'min', 'max', '_buckets')
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+        self._buckets: Dict[int, int] = {}
+
+    def record(self, value: int):
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+        index = _bucket_index(value)
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+
+    def percentile(self, p: float) -> int:
+        """Return the lower bound of the bucket holding the p-th percentile (p in [0, 100])"""
+        if self.count == 0:
+            return 0
+
+        rank = max(1, round(self.count * p / 100))
+        seen = 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen >= rank:
+                return max(self.min, min(self.max, _bucket_lower_bound(index)))
+
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'mean_ns': self.total / self.count if self.count else 0,
+            'min_ns': self.min or 0,
+            'max_ns': self.max or 0,
+            'p50_ns': self.percentile(50),
+            'p90_ns': self.percentile(90),
+            'p99_ns': self.percentile(99),
+            'p999_ns': self.percentile(99.9),
+            'buckets': {_bucket_lower_bound(i): c for i, c in sorted(self._buckets.items())},
+        }
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}< count={self.count}, p50={self.percentile(50)}ns, p99={self.percentile(99)}ns >'
+
+
+class _FunctionStats:
+    __slots__ = ('histogram', 'devices')
+
+    def __init__(self) -> None:
+        self.histogram = LatencyHistogram()
+        self.devices: Dict[Hashable, LatencyHistogram] = {}
+
+    def clear(self):
+        self.histogram = LatencyHistogram()
+        self.devices.clear()
+
+    def record(self, device: Hashable, value: int):
+        self.histogram.record(value)
+        if device is None:
+            return
+
+        histogram = self.devices.get(device)
+        if histogram is None:
+            histogram = self.devices[device] = LatencyHistogram()
+        histogram.record(value)
+
+    def to_dict(self) -> dict:
+        data = self.histogram.to_dict()
+        data['devices'] = {str(d): h.to_dict() for d, h in self.devices.items()}
+
+        return data
+
+
+_lock = threading.Lock()
+_stats: Dict[str, Dict[str, _FunctionStats]] = {}
+# family -> (module, {name: original function})
+_originals: Dict[str, tuple] = {}
+
+
+def _wrap(func: Callable, stats: _FunctionStats, device_arg: Optional[int]) -> Callable:
+    def wrapper(*args, **kwargs):
+        start = perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = perf_counter_ns() - start
+            device = args[device_arg] if device_arg is not None and len(
+                args) > device_arg else None
+            with _lock:
+                stats.record(device, elapsed)
+
+    wrapper.__name__ = getattr(func, '__name__', 'wrapper')
+    wrapper.__doc__ = func.__doc__
+    wrapper.__wrapped__ = func
+
+    return wrapper
+
+
+def enable(*families: str):
+    """
+    Start recording the SDK calls
+
+    The SDK functions are replaced by wrappers recording the number of calls and a latency
+    histogram per function and per device. `disable` restores the original functions,
+    so there is no cost while instrumentation is disabled.
+
+    :param families: 'vjoy' and/or 'vigem' (default: both)
+    """
+    if not families:
+        families = tuple(FAMILIES)
+
+    for family in families:
+        if family in _originals:
+            continue
+
+        module_name, functions = FAMILIES[family]
+        module = importlib.import_module(module_name)
+
+        with _lock:
+            family_stats = _stats.setdefault(family, {})
+
+        originals = {}
+        for name, device_arg in functions.items():
+            func = getattr(module, name)
+            stats = family_stats.get(name)
+            if stats is None:
+                stats = family_stats[name] = _FunctionStats()
+            originals[name] = func
+            setattr(module, name, _wrap(func, stats, device_arg))
+
+        _originals[family] = (module, originals)
+
+
+def disable(*families: str):
+    """
+    Stop recording the SDK calls, the collected data is kept until `reset` is called
+
+    :param families: 'vjoy' and/or 'vigem' (default: both)
+    """
+    if not families:
+        families = tuple(_originals)
+
+    for family in families:
+        entry = _originals.pop(family, None)
+        if entry is None:
+            continue
+
+        module, originals = entry
+        for name, func in originals.items():
+            setattr(module, name, func)
+
+
+def is_enabled(family: str = None) -> bool:
+    if family is None:
+        return bool(_originals)
+
+    return family in _originals
+
+
+def reset():
+    """Discard the collected data"""
+    with _lock:
+        for family_stats in _stats.values():
+            for stats in family_stats.values():
+                stats.clear()
+
+
+def snapshot() -> dict:
+    """
+    :return: {family: {function: {count, mean_ns, min_ns, max_ns, p50_ns, p90_ns, p99_ns, p999_ns, buckets, devices}}}
+    only functions called at least once are included
+    """
+    with _lock:
+        return {
+            family: {name: stats.to_dict() for name, stats in family_stats.items()
+                     if stats.histogram.count}
+            for family, family_stats in _stats.items()
+        }
+
+
+def to_json(**kwargs) -> str:
+    """Return `snapshot` serialized as JSON, kwargs are passed to json.dumps"""
+    return json.dumps(snapshot(), **kwargs)
@@ -0,0 +1,213 @@
+from ctypes import Structure
+from struct import Struct
+from typing import Any, Callable, Dict, Hashable, Iterable, Mapping, Tuple, Type
+
+from .report import get_layout
+
+# Mapping spec: {control: rule}, `control` is any hashable event code (e.g. an evdev code or name).
+# Rules:
+#   {'type': 'button', 'field': 'wButtons', 'mask': XUSB_BUTTON.XUSB_GAMEPAD_A}
+#       a true value sets the bits of `mask`, a false value clears them
+#   {'type': 'axis', 'field': 'sThumbLX', 'scale': 1.0, 'offset': 0, 'min': ..., 'max': ...}
+#       stores round(value * scale + offset), clamped to [min, max] (default: the range of the field)
+#   {'type': 'bits', 'field': 'wButtons', 'values': {-1: DPAD_LEFT, 0: 0, 1: DPAD_RIGHT}}
+#       clears every bit used by `values` and sets the bits of values[value], for hats and dpads
+
+
+class MappingError(Exception):
+    pass
+
+
+def _field_range(fmt) -> Tuple[int, int]:
+    bits = fmt.size * 8
+    if fmt.format[-1].islower():
+        return -(1 << (bits - 1)), (1 << (bits - 1)) - 1
+
+    return 0, (1 << bits) - 1
+
+
+def _bit_field(fmt, masks: Iterable[int]) -> Tuple[Struct, int]:
+    """
+    :return: the unsigned format of the same size (bit 31 of a c_long lButtons is a button,
+        not a sign) and the mask of every bit of the field
+    """
+    unsigned = Struct(fmt.format[:-1] + fmt.format[-1].upper())
+    field_mask = (1 << (unsigned.size * 8)) - 1
+    for mask in masks:
+        if mask & ~field_mask:
+            raise MappingError(f'Mask 0x{mask:X} does not fit in a {unsigned.size * 8} bits field')
+
+    return unsigned, field_mask
+
+
+def _compile_button(offset: int, fmt, rule: Mapping) -> Callable:
+    mask = int(rule['mask'])
+    fmt, field_mask = _bit_field(fmt, [mask])
+    clear = ~mask & field_mask
+    pack_into = fmt.pack_into
+    unpack_from = fmt.unpack_from
+
+    def setter(buffer, value):
+        current = unpack_from(buffer, offset)[0]
+        pack_into(buffer, offset, current | mask if value else current & clear)
+
+    return setter
+
+
+def _compile_axis(offset: int, fmt, rule: Mapping) -> Callable:
+    low, high = _field_range(fmt)
+    low = rule.get('min', low)
+    high = rule.get('max', high)
+    scale = rule.get('scale', 1)
+    shift = rule.get('offset', 0)
+    pack_into = fmt.pack_into
+
+    def setter(buffer, value):
+        value = round(value * scale + shift)
+        if value < low:
+            value = low
+        elif value > high:
+            value = high
+        pack_into(buffer, offset, value)
+
+    return setter
+
+
+def _compile_bits(offset: int, fmt, rule: Mapping) -> Callable:
+    values = {key: int(bits) for key, bits in rule['values'].items()}
+    fmt, field_mask = _bit_field(fmt, values.values())
+    clear = 0
+    for bits in values.values():
+        clear |= bits
+    clear = ~clear & field_mask
+    pack_into = fmt.pack_into
+    unpack_from = fmt.unpack_from
+    get = values.get
+
+    def setter(buffer, value):
+        bits = get(value)
+        if bits is None:
+            return
+        pack_into(buffer, offset, (unpack_from(buffer, offset)[0] & clear) | bits)
+
+    return setter
+
+
+_COMPILERS = {
+    'button': _compile_button,
+    'axis': _compile_axis,
+    'bits': _compile_bits,
+}
+
+
+class CompiledMapping:
+    """
+    Dispatch table from control to a precomputed setter writing directly into the report bytes
+
+    Built once from a mapping spec (see the top of this module) for a report structure,
+    can be shared by any number of devices using that structure.
+    """
+    __slots__ = ('report_type', '_table')
+
+    def __init__(self, spec: Mapping[Hashable, Mapping[str, Any]], report_type: Type[Structure]) -> None:
+        layout = get_layout(report_type)
+        self.report_type = report_type
+        self._table: Dict[Hashable, Callable] = {}
+
+        for control, rule in spec.items():
+            kind = rule.get('type')
+            compiler = _COMPILERS.get(kind)
+            if compiler is None:
+                raise MappingError(
+                    f'{control!r}: unknown rule type {kind!r}, expected one of {list(_COMPILERS)}')
+
+            field = rule.get('field')
+            if field not in layout.fields:
+                raise MappingError(
+                    f'{control!r}: {report_type.__name__} has no scalar field {field!r}')
+
+            offset, fmt = layout.fields[field]
+            self._table[control] = compiler(offset, fmt, rule)
+
+    def __contains__(self, control) -> bool:
+        return control in self._table
+
+    def apply(self, buffer, events: Iterable[Tuple[Hashable, Any]]) -> int:
+        """
+        Apply (control, value) events to a report buffer, unknown controls are ignored
+
+        :param buffer: a writable buffer holding the report, e.g. memoryview(report).cast('B')
+        :return: the number of applied events
+        """
+        get = self._table.get
+        applied = 0
+        for control, value in events:
+            setter = get(control)
+            if setter is not None:
+                setter(buffer, value)
+                applied += 1
+
+        return applied
+
+
+def _device_report(device) -> Structure:
+    report = getattr(device, '_report', None)
+    if report is None:
+        # VJoyDevice
+        report = device._data
+
+    return report
+
+
+class InputMapper:
+    """
+    Applies batches of (control, value) events to a device (VGamepad or VJoyDevice), one flush per batch
+
+        mapper = InputMapper(gamepad, {
+            'BTN_SOUTH': {'type': 'button', 'field': 'wButtons', 'mask': XUSB_BUTTON.XUSB_GAMEPAD_A},
+            'ABS_X': {'type': 'axis', 'field': 'sThumbLX', 'scale': 256, 'offset': -32768},
+        })
+        mapper.process([('BTN_SOUTH', 1), ('ABS_X', 200)])
+    """
+    __slots__ = ('_device', '_mapping', '_buffer')
+
+    def __init__(self, device, mapping) -> None:
+        """
+        :param device: a VGamepad or a VJoyDevice
+        :param mapping: a CompiledMapping, or a mapping spec compiled for the report of the device
+        """
+        report = _device_report(device)
+        if not isinstance(mapping, CompiledMapping):
+            mapping = CompiledMapping(mapping, type(report))
+        elif not isinstance(report, mapping.report_type):
+            raise MappingError(
+                f'The mapping was compiled for {mapping.report_type.__name__}, not {type(report).__name__}')
+
+        self._device = device
+        self._mapping = mapping
+        # the device report is modified in place, the buffer shares its memory
+        self._buffer = memoryview(report).cast('B')
+
+    @property
+    def mapping(self) -> CompiledMapping:
+        return self._mapping
+
+    def apply(self, events: Iterable[Tuple[Hashable, Any]]) -> int:
+        """Apply events to the report of the device without sending it, see `flush`"""
+        locked = getattr(self._device, 'locked', None)
+        if locked is None or not self._device.thread_safe:
+            return self._mapping.apply(self._buffer, events)
+
+        with locked():
+            return self._mapping.apply(self._buffer, events)
+
+    def flush(self):
+        """Send the report to the device"""
+        return self._device.update()
+
+    def process(self, events: Iterable[Tuple[Hashable, Any]]) -> int:
+        """Apply a batch of events and send the report once"""
+        applied = self.apply(events)
+        self.flush()
+
+        return applied
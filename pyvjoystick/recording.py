@@ -0,0 +1,339 @@
+from __future__ import annotations
+
+import mmap
+import time
+import zlib
+from bisect import bisect_left, bisect_right
+from ctypes import Structure, sizeof
+from struct import Struct
+from typing import Iterator, List, Optional, Tuple, Type
+
+# Report stream file format (.pvrs), little endian
+#
+#   file header (48 bytes)
+#       magic           4s  b'PVRS'
+#       version         H   FORMAT_VERSION
+#       record_size     H   8 + size of the report
+#       chunk_records   I   maximum number of records per chunk
+#       compression     B   zlib level, 0 = chunks are stored uncompressed
+#       (padding)       3x
+#       report_type     32s name of the report structure, e.g. b'_JOYSTICK_POSITION_V2'
+#   chunks
+#       records are fixed size: timestamp (q, nanoseconds) followed by the raw report bytes,
+#       grouped in chunks of at most chunk_records records, each chunk compressed on its own
+#   index, one entry (32 bytes) per chunk
+#       first_timestamp q
+#       last_timestamp  q
+#       offset          Q   position of the chunk in the file
+#       stored_size     I   size of the chunk in the file
+#       records         I   number of records in the chunk
+#   footer (16 bytes)
+#       index_offset    Q
+#       chunks          I
+#       magic           4s  b'PVRE'
+#
+# Timestamps are non decreasing, so a timestamp is found with a binary search over the index
+# and then over the records of a single chunk.
+FILE_HEADER = Struct('<4sHHIB3x32s')
+INDEX_ENTRY = Struct('<qqQII')
+FOOTER = Struct('<QI4s')
+TIMESTAMP = Struct('<q')
+MAGIC = b'PVRS'
+END_MAGIC = b'PVRE'
+FORMAT_VERSION = 1
+
+
+class RecordingFormatError(Exception):
+    pass
+
+
+def get_report_type(name: str) -> Type[Structure]:
+    """Return the report structure with the given name (XUSB_REPORT, DS4_REPORT, _JOYSTICK_POSITION_V*)"""
+    from .vigem import constants as vigem_constants
+    from .vjoy import _sdk as vjoy_sdk
+
+    for module in (vigem_constants, vjoy_sdk):
+        report_type = getattr(module, name, None)
+        if isinstance(report_type, type) and issubclass(report_type, Structure):
+            return report_type
+
+    raise RecordingFormatError(f'Unknown report type {name!r}')
+
+
+class ReportWriter:
+    """Writes timestamped reports to a report stream file"""
+
+    def __init__(self, path, report_type: Type[Structure], chunk_records: int = 4096,
+                 compression: int = 6) -> None:
+        """
+        :param path: the file to create
+        :param report_type: the report structure, e.g. XUSB_REPORT
+        :param chunk_records: number of records per chunk, also the granularity of the decompression
+        :param compression: zlib level (1-9), 0 to store the chunks uncompressed (they can then be mapped without copy)
+        """
+        name = report_type.__name__.encode('ascii')
+        if len(name) > 32:
+            raise ValueError(f'Report type name too long: {report_type.__name__}')
+
+        self._report_size = sizeof(report_type)
+        self._record_size = TIMESTAMP.size + self._report_size
+        self._chunk_records = chunk_records
+        self._compression = compression
+        self._buffer = bytearray()
+        self._buffered = 0
+        self._first_timestamp = None
+        self._last_timestamp = None
+        self._index: List[Tuple[int, int, int, int, int]] = []
+        self._file = open(path, 'wb')
+        self._file.write(FILE_HEADER.pack(MAGIC, FORMAT_VERSION, self._record_size,
+                                          chunk_records, compression, name))
+
+    def write(self, report, timestamp: int = None):
+        """
+        :param report: the report, as a ctypes structure or as bytes (e.g. device.snapshot())
+        :param timestamp: in nanoseconds (default: time.time_ns()), must not decrease
+        """
+        if timestamp is None:
+            timestamp = time.time_ns()
+
+        if self._last_timestamp is not None and timestamp < self._last_timestamp:
+            raise ValueError('Timestamps must not decrease')
+
+        data = bytes(report)
+        if len(data) != self._report_size:
+            raise ValueError(
+                f'Expected a report of {self._report_size} bytes, but got {len(data)}')
+
+        if self._buffered == 0:
+            self._first_timestamp = timestamp
+        self._last_timestamp = timestamp
+
+        self._buffer += TIMESTAMP.pack(timestamp)
+        self._buffer += data
+        self._buffered += 1
+
+        if self._buffered == self._chunk_records:
+            self._flush_chunk()
+
+    def _flush_chunk(self):
+        if self._buffered == 0:
+            return
+
+        data = bytes(self._buffer)
+        if self._compression:
+            data = zlib.compress(data, self._compression)
+
+        offset = self._file.tell()
+        self._file.write(data)
+        self._index.append((self._first_timestamp, self._last_timestamp,
+                            offset, len(data), self._buffered))
+        self._buffer.clear()
+        self._buffered = 0
+
+    def close(self):
+        if self._file.closed:
+            return
+
+        self._flush_chunk()
+        index_offset = self._file.tell()
+        for entry in self._index:
+            self._file.write(INDEX_ENTRY.pack(*entry))
+        self._file.write(FOOTER.pack(index_offset, len(self._index), END_MAGIC))
+        self._file.close()
+
+    def __enter__(self) -> ReportWriter:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ReportReader:
+    """
+    Memory mapped reader of a report stream file
+
+    The NumPy methods (chunk_array, read, and the field helpers) need numpy installed.
+    For uncompressed files they return views of the mapping: if some are still alive on
+    `close`, the file stays mapped until the last of them is garbage collected.
+    """
+
+    def __init__(self, path, report_type: Type[Structure] = None) -> None:
+        """
+        :param report_type: the report structure, by default it is looked up from the name stored in the file
+        """
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._map) < FILE_HEADER.size + FOOTER.size:
+            raise RecordingFormatError('File too small')
+
+        magic, version, record_size, chunk_records, compression, name = FILE_HEADER.unpack_from(
+            self._map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise RecordingFormatError(
+                f'Not a report stream file (magic={magic!r}, version={version})')
+
+        index_offset, chunks, end_magic = FOOTER.unpack_from(
+            self._map, len(self._map) - FOOTER.size)
+        if end_magic != END_MAGIC:
+            raise RecordingFormatError('Missing footer, the file was not closed')
+
+        self.record_size = record_size
+        self.chunk_records = chunk_records
+        self.compression = compression
+        self.report_type = report_type or get_report_type(
+            name.rstrip(b'\0').decode('ascii'))
+
+        if TIMESTAMP.size + sizeof(self.report_type) != record_size:
+            raise RecordingFormatError(
+                f'{self.report_type.__name__} does not match the record size {record_size}')
+
+        self._index = [INDEX_ENTRY.unpack_from(self._map, index_offset + i * INDEX_ENTRY.size)
+                       for i in range(chunks)]
+        self._first_timestamps = [entry[0] for entry in self._index]
+        self._dtype = None
+
+    def __len__(self) -> int:
+        return sum(entry[4] for entry in self._index)
+
+    @property
+    def chunks(self) -> int:
+        return len(self._index)
+
+    @property
+    def start_time(self) -> Optional[int]:
+        return self._index[0][0] if self._index else None
+
+    @property
+    def end_time(self) -> Optional[int]:
+        return self._index[-1][1] if self._index else None
+
+    def chunk_bytes(self, chunk: int):
+        """:return: the records of a chunk, a memoryview of the file if it is not compressed"""
+        _, _, offset, stored_size, _ = self._index[chunk]
+        data = memoryview(self._map)[offset:offset + stored_size]
+        if self.compression:
+            return zlib.decompress(data)
+
+        return data
+
+    def _search_chunk(self, chunk: int, timestamp: int) -> int:
+        # binary search directly over the records of the chunk
+        data = self.chunk_bytes(chunk)
+        record_size = self.record_size
+        lo, hi = 0, self._index[chunk][4]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if TIMESTAMP.unpack_from(data, mid * record_size)[0] < timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        return lo
+
+    def seek(self, timestamp: int) -> Tuple[int, int]:
+        """
+        Find the first record with a timestamp >= `timestamp`, O(log n)
+
+        :return: (chunk, record inside the chunk), (chunks, 0) if there is none
+        """
+        # last chunk starting before the timestamp, earlier chunks end before it
+        chunk = max(0, bisect_left(self._first_timestamps, timestamp) - 1)
+        while chunk < len(self._index):
+            if self._index[chunk][1] >= timestamp:
+                return chunk, self._search_chunk(chunk, timestamp)
+            chunk += 1
+
+        return len(self._index), 0
+
+    def __iter__(self) -> Iterator[Tuple[int, bytes]]:
+        """Iterate over (timestamp, report bytes), record by record"""
+        return self.iter_records()
+
+    def iter_records(self, start: int = None, end: int = None) -> Iterator[Tuple[int, bytes]]:
+        """Iterate over (timestamp, report bytes) with start <= timestamp < end"""
+        chunk, record = self.seek(start) if start is not None else (0, 0)
+        record_size = self.record_size
+
+        for current in range(chunk, len(self._index)):
+            data = self.chunk_bytes(current)
+            for i in range(record, self._index[current][4]):
+                position = i * record_size
+                (timestamp,) = TIMESTAMP.unpack_from(data, position)
+                if end is not None and timestamp >= end:
+                    return
+                yield timestamp, bytes(data[position + TIMESTAMP.size:position + record_size])
+            record = 0
+
+    @property
+    def dtype(self):
+        """NumPy dtype of a record: ('timestamp', int64) and ('report', dtype of the report structure)"""
+        if self._dtype is None:
+            import numpy as np
+
+            self._dtype = np.dtype({
+                'names': ['timestamp', 'report'],
+                'formats': ['<i8', np.dtype(self.report_type)],
+                'offsets': [0, TIMESTAMP.size],
+                'itemsize': self.record_size,
+            })
+
+        return self._dtype
+
+    def chunk_array(self, chunk: int):
+        """:return: the records of a chunk as a NumPy structured array (a view of the file if it is not compressed)"""
+        import numpy as np
+
+        return np.frombuffer(self.chunk_bytes(chunk), dtype=self.dtype)
+
+    def read(self, start: int = None, end: int = None):
+        """:return: the records with start <= timestamp < end as a NumPy structured array"""
+        import numpy as np
+
+        first = self.seek(start)[0] if start is not None else 0
+        last = len(self._index) if end is None else bisect_right(
+            self._first_timestamps, end)
+        if first >= last:
+            return np.empty(0, dtype=self.dtype)
+
+        arrays = [self.chunk_array(chunk) for chunk in range(first, last)]
+        records = arrays[0] if len(arrays) == 1 else np.concatenate(arrays)
+
+        timestamps = records['timestamp']
+        lo = 0 if start is None else np.searchsorted(timestamps, start, 'left')
+        hi = len(records) if end is None else np.searchsorted(
+            timestamps, end, 'left')
+
+        return records[lo:hi]
+
+    def close(self):
+        try:
+            self._map.close()
+        except BufferError:
+            # arrays returned by read / chunk_array still view the file, the mapping is released with them
+            pass
+
+    def __enter__(self) -> ReportReader:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def axis(records, name: str):
+    """:return: a view of a report field (e.g. 'sThumbLX', 'wAxisX') of records returned by ReportReader.read"""
+    return records['report'][name]
+
+
+def button_bits(records, name: str = 'wButtons'):
+    """
+    :return: a (records, bits) boolean array with the state of every button of a field
+        ('wButtons', 'lButtons', ...), bit 0 first
+    """
+    import numpy as np
+
+    field = records['report'][name]
+    raw = np.ascontiguousarray(field).view(np.uint8).reshape(
+        len(field), field.dtype.itemsize)
+
+    return np.unpackbits(raw, axis=1, bitorder='little').astype(bool)
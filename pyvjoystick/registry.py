@@ -0,0 +1,77 @@
+import atexit
+import threading
+import warnings
+import weakref
+from typing import List
+
+# every open device, closed on interpreter exit
+_devices = weakref.WeakSet()
+_lock = threading.Lock()
+
+
+def register(device):
+    """Track an open device so it is released at exit"""
+    with _lock:
+        _devices.add(device)
+
+
+def unregister(device):
+    """Stop tracking a device, called by the device when it is closed"""
+    with _lock:
+        _devices.discard(device)
+
+
+def tracked_devices() -> list:
+    """Return the devices that are currently open"""
+    with _lock:
+        return list(_devices)
+
+
+def _close(device, errors: List[BaseException]):
+    try:
+        device.close()
+    except Exception as e:
+        errors.append(e)
+
+
+def close_all(parallel: bool = True) -> List[BaseException]:
+    """
+    Close every open device
+
+    The driver calls release the GIL so devices are closed concurrently, one thread per device.
+
+    :param parallel: close the devices concurrently
+    :return: the exceptions raised while closing, if any
+    """
+    devices = tracked_devices()
+    errors: List[BaseException] = []
+
+    if not parallel or len(devices) < 2:
+        for device in devices:
+            _close(device, errors)
+
+        return errors
+
+    threads = []
+    for device in devices:
+        thread = threading.Thread(target=_close, args=(device, errors))
+        try:
+            thread.start()
+        except RuntimeError:
+            # threads can not be started anymore, close it in this one
+            _close(device, errors)
+            continue
+        threads.append(thread)
+
+    for thread in threads:
+        thread.join()
+
+    return errors
+
+
+def _close_all_at_exit():
+    for error in close_all():
+        warnings.warn(f'Error closing device at exit: {error!r}')
+
+
+atexit.register(_close_all_at_exit)
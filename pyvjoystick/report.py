@@ -0,0 +1,156 @@
+from ctypes import Structure, sizeof
+from functools import lru_cache
+from struct import Struct
+from typing import Dict, Iterator, Tuple, Type
+
+
+class ReportLayout:
+    """
+    Precomputed field table of a ctypes report structure (XUSB_REPORT, DS4_REPORT, _JOYSTICK_POSITION_V*, ...)
+
+    Maps every scalar field to its offset and a precompiled struct.Struct, so reports can be
+    read and written directly in a byte buffer without going through the ctypes descriptors.
+    Array and nested structure fields are only reachable through `as_struct`.
+    """
+    __slots__ = ('struct_type', 'size', 'fields')
+
+    def __init__(self, struct_type: Type[Structure]) -> None:
+        self.struct_type = struct_type
+        self.size = sizeof(struct_type)
+        self.fields: Dict[str, Tuple[int, Struct]] = {}
+
+        for name, ctype, *_ in struct_type._fields_:
+            code = getattr(ctype, '_type_', None)
+            if not isinstance(code, str):
+                continue
+
+            # native sizes, the same ctypes uses
+            self.fields[name] = (getattr(struct_type, name).offset,
+                                 Struct('@' + code))
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}< {self.struct_type.__name__}, size={self.size} >'
+
+
+@lru_cache(maxsize=None)
+def get_layout(struct_type: Type[Structure]) -> ReportLayout:
+    """Return the (cached) layout of a report structure"""
+    return ReportLayout(struct_type)
+
+
+class CompactReport:
+    """
+    Report stored as raw bytes in a buffer, with field access through a precomputed offset table
+
+    The buffer can be owned (a bytearray), shared with other reports (see ReportArray) or be the
+    memory of an existing ctypes structure (see from_struct). Conversions to and from the ctypes
+    structure do not copy.
+    """
+    __slots__ = ('_layout', '_buffer', '_offset')
+
+    def __init__(self, struct_type: Type[Structure], buffer=None, offset: int = 0) -> None:
+        """
+        :param struct_type: the ctypes structure describing the report, e.g. XUSB_REPORT
+        :param buffer: a writable buffer holding the report (default: a new zeroed bytearray)
+        :param offset: position of the report inside the buffer
+        """
+        self._layout = get_layout(struct_type)
+        self._buffer = bytearray(
+            self._layout.size) if buffer is None else buffer
+        self._offset = offset
+
+    @classmethod
+    def from_struct(cls, report: Structure) -> 'CompactReport':
+        """Return a CompactReport sharing the memory of a ctypes structure (e.g. a device report)"""
+        return cls(type(report), memoryview(report).cast('B'))
+
+    def as_struct(self) -> Structure:
+        """Return the report as a ctypes structure sharing this buffer"""
+        return self._layout.struct_type.from_buffer(self._buffer, self._offset)
+
+    def get(self, name: str):
+        offset, fmt = self._layout.fields[name]
+        return fmt.unpack_from(self._buffer, self._offset + offset)[0]
+
+    def set(self, name: str, value):
+        offset, fmt = self._layout.fields[name]
+        fmt.pack_into(self._buffer, self._offset + offset, value)
+
+    __getitem__ = get
+    __setitem__ = set
+
+    def to_bytes(self) -> bytes:
+        return bytes(self._buffer[self._offset:self._offset + self._layout.size])
+
+    def load(self, data: bytes):
+        """Overwrite the report with raw bytes (e.g. a device snapshot)"""
+        size = self._layout.size
+        if len(data) != size:
+            raise ValueError(
+                f'Expected {size} bytes, but got {len(data)}')
+
+        self._buffer[self._offset:self._offset + size] = data
+
+    def __repr__(self) -> str:
+        values = ', '.join(f'{name}={self.get(name)}' for name in self._layout.fields)
+        return f'{self.__class__.__name__}< {self._layout.struct_type.__name__}: {values} >'
+
+
+class ReportArray:
+    """
+    Fixed number of reports of the same type packed in a single bytearray
+
+    10,000 XUSB_REPORT take 120 KB. Reports are accessed by index, either field by field
+    (get/set) or as CompactReport/ctypes views sharing the array memory.
+    """
+    __slots__ = ('_layout', '_buffer', '_count')
+
+    def __init__(self, struct_type: Type[Structure], count: int) -> None:
+        self._layout = get_layout(struct_type)
+        self._buffer = bytearray(self._layout.size * count)
+        self._count = count
+
+    @property
+    def layout(self) -> ReportLayout:
+        return self._layout
+
+    @property
+    def buffer(self) -> bytearray:
+        return self._buffer
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _base(self, index: int) -> int:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('report index out of range')
+
+        return index * self._layout.size
+
+    def get(self, index: int, name: str):
+        offset, fmt = self._layout.fields[name]
+        return fmt.unpack_from(self._buffer, self._base(index) + offset)[0]
+
+    def set(self, index: int, name: str, value):
+        offset, fmt = self._layout.fields[name]
+        fmt.pack_into(self._buffer, self._base(index) + offset, value)
+
+    def fill(self, report: Structure):
+        """Initialize every report with a copy of `report` (e.g. a default report)"""
+        self._buffer[:] = bytes(report) * self._count
+
+    def __getitem__(self, index: int) -> CompactReport:
+        return CompactReport(self._layout.struct_type, self._buffer, self._base(index))
+
+    def __iter__(self) -> Iterator[CompactReport]:
+        for index in range(self._count):
+            yield self[index]
+
+    def as_struct(self, index: int) -> Structure:
+        """Return the report at `index` as a ctypes structure sharing the array memory"""
+        return self._layout.struct_type.from_buffer(self._buffer, self._base(index))
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}< {self._layout.struct_type.__name__} x {self._count} >'
@@ -1,13 +1,20 @@
 try:
-    import importlib.resources as pkg_resources
+    from importlib.resources import files
 except ImportError:
-    import importlib_resources as pkg_resources
+    from importlib_resources import files
 
+import os
+import sys
+from functools import lru_cache
+from hashlib import sha256
 from io import BytesIO, StringIO
+from pathlib import Path
+
+CACHE_DIR_ENV = 'PYVJOYSTICK_CACHE_DIR'
 
 
 def get_as_string(module, resource: str) -> str:
-    return pkg_resources.read_text(module, resource)
+    return files(module).joinpath(resource).read_text()
 
 
 def get_as_file_like_string(module, resource: str) -> StringIO:
@@ -16,7 +23,7 @@ def get_as_file_like_string(module, resource: str) -> StringIO:
 
 
 def get_as_bytes(module, resource: str) -> bytes:
-    return pkg_resources.read_binary(module, resource)
+    return files(module).joinpath(resource).read_bytes()
 
 
 def get_as_file_like_bytes(module, resource: str) -> BytesIO:
@@ -24,6 +31,54 @@ def get_as_file_like_bytes(module, resource: str) -> BytesIO:
     return BytesIO(text)
 
 
-def get_path(module, resource: str):
-    with pkg_resources.path(module, resource) as pth:
-        return str(pth)
+def get_cache_dir() -> Path:
+    """Directory where resources that are not plain files (zipapp, frozen, ...) are extracted"""
+    cache_dir = os.environ.get(CACHE_DIR_ENV)
+    if cache_dir:
+        return Path(cache_dir)
+
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or Path.home() / 'AppData' / 'Local'
+        return Path(base) / 'pyvjoystick' / 'Cache'
+
+    base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'pyvjoystick'
+
+
+def _extract(data: bytes, resource: str) -> Path:
+    digest = sha256(data).hexdigest()[:16]
+    target = get_cache_dir() / digest / resource
+
+    if target.is_file() and target.stat().st_size == len(data):
+        return target
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    # write to a temporary file first, so a concurrent process never sees a partial file
+    tmp = target.with_name(f'{resource}.{os.getpid()}.tmp')
+    tmp.write_bytes(data)
+    try:
+        os.replace(tmp, target)
+    except OSError:
+        # the file is in use by another process that already extracted it
+        tmp.unlink()
+        if not target.is_file():
+            raise
+
+    return target
+
+
+@lru_cache(maxsize=None)
+def get_path(module, resource: str) -> str:
+    """
+    Return a filesystem path to a resource, valid for the whole life of the process
+
+    Resources installed as plain files are used in place. Otherwise (zip imports, frozen apps)
+    the resource is extracted once to a content-hashed directory inside `get_cache_dir()`,
+    which is reused by the next processes.
+    """
+    resource_file = files(module).joinpath(resource)
+
+    if isinstance(resource_file, Path) and resource_file.is_file():
+        return str(resource_file)
+
+    return str(_extract(resource_file.read_bytes(), resource))
@@ -0,0 +1,453 @@
+from __future__ import annotations
+
+import select
+import socket
+import threading
+from struct import Struct
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+# Wire format, little endian, every packet is a 12 bytes header followed by the payload:
+#
+#   magic      2s   b'PV'
+#   version    B    PROTOCOL_VERSION
+#   kind       B    PACKET_REPORT (client -> server) or PACKET_NOTIFICATION (server -> client)
+#   device_id  H    key of the device in the server device mapping
+#   sequence   I    per device and per sender sequence number, wraps around at 2 ** 32
+#   length     H    payload size in bytes
+#
+# PACKET_REPORT payload: the raw bytes of the device report (XUSB_REPORT, DS4_REPORT or
+# _JOYSTICK_POSITION_V*), exactly as returned by `device.snapshot()`.
+# PACKET_NOTIFICATION payload: 3 bytes, large_motor, small_motor and led_number.
+#
+# UDP carries one packet per datagram, TCP carries a stream of packets.
+HEADER = Struct('<2sBBHIH')
+MAGIC = b'PV'
+PROTOCOL_VERSION = 1
+PACKET_REPORT = 1
+PACKET_NOTIFICATION = 2
+
+_NOTIFICATION = Struct('<BBB')
+_SEQUENCE_MASK = 0xFFFFFFFF
+_SEQUENCE_HALF = 0x80000000
+_MAX_DATAGRAM = 0xFFFF
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def encode_packet(kind: int, device_id: int, sequence: int, payload: bytes) -> bytes:
+    return HEADER.pack(MAGIC, PROTOCOL_VERSION, kind, device_id,
+                       sequence & _SEQUENCE_MASK, len(payload)) + payload
+
+
+def encode_report(device_id: int, sequence: int, report) -> bytes:
+    """
+    :param report: the report as bytes or as a ctypes structure
+    """
+    return encode_packet(PACKET_REPORT, device_id, sequence, bytes(report))
+
+
+def decode_notification(payload: bytes) -> Tuple[int, int, int]:
+    """:return: (large_motor, small_motor, led_number)"""
+    return _NOTIFICATION.unpack(payload)
+
+
+def decode_packets(data, offset: int = 0) -> Tuple[List[Tuple[int, int, int, bytes]], int]:
+    """
+    Decode every complete packet in `data`
+
+    :return: ([(kind, device_id, sequence, payload), ...], offset of the first undecoded byte)
+    """
+    packets = []
+    size = len(data)
+    header_size = HEADER.size
+
+    while size - offset >= header_size:
+        magic, version, kind, device_id, sequence, length = HEADER.unpack_from(
+            data, offset)
+        if magic != MAGIC or version != PROTOCOL_VERSION:
+            raise ProtocolError(
+                f'Invalid packet header (magic={magic!r}, version={version})')
+
+        end = offset + header_size + length
+        if end > size:
+            break
+
+        packets.append((kind, device_id, sequence,
+                       bytes(data[offset + header_size:end])))
+        offset = end
+
+    return packets, offset
+
+
+def is_newer(sequence: int, last: int) -> bool:
+    """Serial number comparison (RFC 1982), tolerates the wrap around of the sequence numbers"""
+    return 0 < ((sequence - last) & _SEQUENCE_MASK) < _SEQUENCE_HALF
+
+
+class ServerStats:
+    __slots__ = ('received', 'applied', 'stale',
+                 'invalid', 'unknown_device', 'errors', 'notifications')
+
+    def __init__(self) -> None:
+        self.received = 0
+        self.applied = 0
+        self.stale = 0
+        self.invalid = 0
+        self.unknown_device = 0
+        self.errors = 0
+        self.notifications = 0
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        values = ', '.join(f'{k}={v}' for k, v in self.to_dict().items())
+        return f'{self.__class__.__name__}< {values} >'
+
+
+class ReportServer:
+    """
+    Base of the network servers, applies received reports to local devices
+
+    Devices are any object with `restore(bytes)` and `update()` (VGamepad, VJoyDevice, or a fake
+    backend). Packets are processed in batches: for each device only the newest report of the
+    batch is applied, with a single `update()`, and reports older than the last one of the same
+    sender (reordered or duplicated packets) are dropped. Errors raised by `update()` are counted
+    in `stats.errors`. Rumble/LED notifications of devices that support `register_notification`
+    are sent back to the last client that updated the device.
+    """
+
+    def __init__(self, devices: Mapping[int, object], batch_size: int = 256) -> None:
+        self._devices = devices
+        self._batch_size = batch_size
+        # (device_id, sender) -> last sequence seen
+        self._last_sequence: Dict[Tuple[int, object], int] = {}
+        self._notification_sequence: Dict[int, int] = {}
+        self._clients: Dict[int, object] = {}
+        self._handlers: Dict[int, Callable] = {}
+        self._apply_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.stats = ServerStats()
+
+    def apply(self, packets: Iterable[Tuple[int, int, int, bytes]], client=None):
+        """
+        Apply a batch of decoded packets, see `decode_packets`
+
+        :param client: the sender of the packets, where the notifications of the updated devices are sent
+        """
+        self._apply_received([(packet, client) for packet in packets])
+
+    def _apply_received(self, received: List[Tuple[Tuple[int, int, int, bytes], object]]):
+        # sequence numbers are scoped to the sender: a client that reconnects, or another client,
+        # starts its own sequence; between senders the last received report wins
+        newest: Dict[int, Tuple[object, bytes]] = {}
+        stats = self.stats
+
+        with self._apply_lock:
+            last_sequence = self._last_sequence
+            batch_sequence: Dict[Tuple[int, object], int] = {}
+
+            for (kind, device_id, sequence, payload), client in received:
+                stats.received += 1
+                if kind != PACKET_REPORT:
+                    stats.invalid += 1
+                    continue
+
+                if device_id not in self._devices:
+                    stats.unknown_device += 1
+                    continue
+
+                key = (device_id, client)
+                last = batch_sequence.get(key)
+                if last is None:
+                    last = last_sequence.get(key)
+                if last is not None and not is_newer(sequence, last):
+                    stats.stale += 1
+                    continue
+
+                if device_id in newest:
+                    # superseded by a newer report in the same batch
+                    stats.stale += 1
+                batch_sequence[key] = sequence
+                newest[device_id] = (client, payload)
+
+            last_sequence.update(batch_sequence)
+
+            for device_id, (client, payload) in newest.items():
+                device = self._devices[device_id]
+                try:
+                    device.restore(payload)
+                except ValueError:
+                    stats.invalid += 1
+                    continue
+
+                try:
+                    device.update()
+                except Exception:
+                    # a driver error must not stop the server
+                    stats.errors += 1
+                    continue
+
+                stats.applied += 1
+                if client is not None:
+                    self._clients[device_id] = client
+
+    def forget(self, client):
+        """Drop the sequence numbers of a sender, e.g. a closed connection"""
+        with self._apply_lock:
+            for key in [key for key in self._last_sequence if key[1] == client]:
+                del self._last_sequence[key]
+
+    def _attach_notifications(self):
+        for device_id, device in self._devices.items():
+            callback = self._make_notification_callback(device_id)
+            if hasattr(device, 'add_notification_handler'):
+                # keeps the handlers registered by the application
+                device.add_notification_handler(callback)
+                self._handlers[device_id] = callback
+            elif hasattr(device, 'register_notification'):
+                device.register_notification(callback)
+
+    def _detach_notifications(self):
+        for device_id, device in self._devices.items():
+            callback = self._handlers.pop(device_id, None)
+            if callback is not None:
+                device.remove_notification_handler(callback)
+            elif hasattr(device, 'unregister_notification'):
+                device.unregister_notification()
+
+    def _make_notification_callback(self, device_id: int):
+        def callback(client, target, large_motor, small_motor, led_number, user_data):
+            self._notify(device_id, large_motor, small_motor, led_number)
+
+        return callback
+
+    def _notify(self, device_id: int, large_motor: int, small_motor: int, led_number: int):
+        client = self._clients.get(device_id)
+        if client is None:
+            return
+
+        sequence = (self._notification_sequence.get(
+            device_id, 0) + 1) & _SEQUENCE_MASK
+        self._notification_sequence[device_id] = sequence
+        packet = encode_packet(PACKET_NOTIFICATION, device_id, sequence,
+                               _NOTIFICATION.pack(large_motor, small_motor, led_number))
+        try:
+            self._send_to(client, packet)
+        except OSError:
+            return
+
+        self.stats.notifications += 1
+
+    def _send_to(self, client, packet: bytes):
+        raise NotImplementedError
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        raise NotImplementedError
+
+    def serve_forever(self):
+        """Serve until `close` is called"""
+        raise NotImplementedError
+
+    def start(self) -> ReportServer:
+        """Serve in a background thread, forwarding the device notifications to the clients"""
+        self._attach_notifications()
+        self._thread = threading.Thread(
+            target=self.serve_forever, name=self.__class__.__name__, daemon=True)
+        self._thread.start()
+
+        return self
+
+    def close(self):
+        """Stop serving and close the sockets"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            self._detach_notifications()
+
+    def __enter__(self) -> ReportServer:
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class UDPReportServer(ReportServer):
+    """Receives one packet per datagram"""
+
+    def __init__(self, devices: Mapping[int, object], host: str = '127.0.0.1', port: int = 0,
+                 batch_size: int = 256, poll_interval: float = 0.1) -> None:
+        super().__init__(devices, batch_size)
+        self._poll_interval = poll_interval
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.bind((host, port))
+        self._socket.setblocking(False)
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._socket.getsockname()
+
+    def _send_to(self, client, packet: bytes):
+        self._socket.sendto(packet, client)
+
+    def _receive_batch(self) -> List[Tuple[Tuple[int, int, int, bytes], object]]:
+        received = []
+        recvfrom = self._socket.recvfrom
+        for _ in range(self._batch_size):
+            try:
+                data, client = recvfrom(_MAX_DATAGRAM)
+            except (BlockingIOError, InterruptedError):
+                break
+
+            try:
+                packets, end = decode_packets(data)
+            except ProtocolError:
+                self.stats.invalid += 1
+                continue
+
+            if len(packets) != 1 or end != len(data):
+                self.stats.invalid += 1
+                continue
+
+            received.append((packets[0], client))
+
+        return received
+
+    def serve_forever(self):
+        while not self._stop.is_set():
+            readable, _, _ = select.select(
+                [self._socket], [], [], self._poll_interval)
+            if not readable:
+                continue
+
+            received = self._receive_batch()
+            if not received:
+                continue
+
+            self._apply_received(received)
+
+    def close(self):
+        super().close()
+        self._socket.close()
+
+
+class TCPReportServer(ReportServer):
+    """Receives a stream of packets on each connection, one thread per connection"""
+
+    def __init__(self, devices: Mapping[int, object], host: str = '127.0.0.1', port: int = 0,
+                 batch_size: int = 256, poll_interval: float = 0.1) -> None:
+        super().__init__(devices, batch_size)
+        self._poll_interval = poll_interval
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind((host, port))
+        self._socket.listen()
+        self._connections: List[threading.Thread] = []
+        self._send_locks: Dict[socket.socket, threading.Lock] = {}
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._socket.getsockname()
+
+    def _send_to(self, client, packet: bytes):
+        lock = self._send_locks.get(client)
+        if lock is None:
+            return
+
+        with lock:
+            client.sendall(packet)
+
+    def serve_forever(self):
+        while not self._stop.is_set():
+            readable, _, _ = select.select(
+                [self._socket], [], [], self._poll_interval)
+            if not readable:
+                continue
+
+            connection, _ = self._socket.accept()
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._send_locks[connection] = threading.Lock()
+            thread = threading.Thread(
+                target=self._serve_connection, args=(connection,), daemon=True)
+            self._connections.append(thread)
+            thread.start()
+
+    def _serve_connection(self, connection: socket.socket):
+        buffer = bytearray()
+        chunk_size = self._batch_size * (HEADER.size + 64)
+
+        try:
+            while not self._stop.is_set():
+                readable, _, _ = select.select(
+                    [connection], [], [], self._poll_interval)
+                if not readable:
+                    continue
+
+                data = connection.recv(chunk_size)
+                if not data:
+                    break
+
+                buffer += data
+                try:
+                    packets, end = decode_packets(buffer)
+                except ProtocolError:
+                    self.stats.invalid += 1
+                    break
+
+                del buffer[:end]
+                if packets:
+                    self.apply(packets, connection)
+        except OSError:
+            pass
+        finally:
+            self._send_locks.pop(connection, None)
+            self.forget(connection)
+            connection.close()
+
+    def close(self):
+        super().close()
+        for thread in self._connections:
+            thread.join()
+        self._connections.clear()
+        self._socket.close()
+
+
+class UDPReportClient:
+    """Minimal client sending reports to a UDPReportServer and receiving its notifications"""
+
+    def __init__(self, address: Tuple[str, int]) -> None:
+        self._address = address
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sequences: Dict[int, int] = {}
+
+    def send(self, device_id: int, report):
+        """
+        :param report: the report as bytes or as a ctypes structure
+        """
+        sequence = (self._sequences.get(device_id, 0) + 1) & _SEQUENCE_MASK
+        self._sequences[device_id] = sequence
+        self._socket.sendto(encode_report(
+            device_id, sequence, report), self._address)
+
+    def receive_notification(self, timeout: float = None) -> Optional[Tuple[int, int, int, int]]:
+        """:return: (device_id, large_motor, small_motor, led_number), or None on timeout"""
+        self._socket.settimeout(timeout)
+        try:
+            data, _ = self._socket.recvfrom(_MAX_DATAGRAM)
+        except socket.timeout:
+            return None
+
+        packets, _ = decode_packets(data)
+        for kind, device_id, _, payload in packets:
+            if kind == PACKET_NOTIFICATION:
+                return (device_id, *decode_notification(payload))
+
+        return None
+
+    def close(self):
+        self._socket.close()
@@ -12,7 +12,6 @@ class lazy_eval:
         self._kwargs = kwargs
 
     def __getattr__(self, attr):
-        print(f'get arrt {attr}')
         result = self._func(*self._args, **self._kwargs)
         updated_context = {self._variable_name: result}
 
@@ -4,8 +4,11 @@ from .constants import (
     DS4_SPECIAL_BUTTONS,
     XUSB_BUTTON,
 )
+from .pool import VGamepadPool
+from .vbus import VBus, VBusManager
 from .vds4 import VDS4Gamepad
 from .vx360 import VX360Gamepad
 
 __all__ = ['DS4_BUTTONS', 'DS4_DPAD_DIRECTIONS',
-           'DS4_SPECIAL_BUTTONS', 'XUSB_BUTTON', 'VDS4Gamepad', 'VX360Gamepad']
+           'DS4_SPECIAL_BUTTONS', 'XUSB_BUTTON', 'VDS4Gamepad', 'VX360Gamepad',
+           'VGamepadPool', 'VBus', 'VBusManager']
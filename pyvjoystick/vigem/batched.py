@@ -0,0 +1,234 @@
+from typing import Type
+
+import numpy as np
+
+from .constants import (
+    DS4_REPORT,
+    DS4_REPORT_INIT,
+    XUSB_BUTTON,
+    XUSB_REPORT,
+)
+from .device import VGamepad
+from .exceptions import ViGemError
+
+# DS4_DPAD_DIRECTIONS value -> XUSB dpad buttons
+X360_DPAD_BUTTONS = np.array([
+    XUSB_BUTTON.XUSB_GAMEPAD_DPAD_UP,
+    XUSB_BUTTON.XUSB_GAMEPAD_DPAD_UP | XUSB_BUTTON.XUSB_GAMEPAD_DPAD_RIGHT,
+    XUSB_BUTTON.XUSB_GAMEPAD_DPAD_RIGHT,
+    XUSB_BUTTON.XUSB_GAMEPAD_DPAD_DOWN | XUSB_BUTTON.XUSB_GAMEPAD_DPAD_RIGHT,
+    XUSB_BUTTON.XUSB_GAMEPAD_DPAD_DOWN,
+    XUSB_BUTTON.XUSB_GAMEPAD_DPAD_DOWN | XUSB_BUTTON.XUSB_GAMEPAD_DPAD_LEFT,
+    XUSB_BUTTON.XUSB_GAMEPAD_DPAD_LEFT,
+    XUSB_BUTTON.XUSB_GAMEPAD_DPAD_UP | XUSB_BUTTON.XUSB_GAMEPAD_DPAD_LEFT,
+    0,
+], dtype=np.uint16)
+
+X360_DPAD_MASK = np.uint16(XUSB_BUTTON.XUSB_GAMEPAD_DPAD_UP | XUSB_BUTTON.XUSB_GAMEPAD_DPAD_DOWN
+                           | XUSB_BUTTON.XUSB_GAMEPAD_DPAD_LEFT | XUSB_BUTTON.XUSB_GAMEPAD_DPAD_RIGHT)
+
+
+def _select(index):
+    return slice(None) if index is None else index
+
+
+def _bits(value) -> np.ndarray:
+    return np.asarray(value, dtype=np.uint16)
+
+
+class BatchedState:
+    """
+    State of N virtual gamepads with no driver attached, stored as one structured NumPy array
+
+    The dtype is the one of the report structure, so every row has exactly the memory layout of
+    the report sent to ViGEmBus. Every setter takes an optional `index` (an int, a slice, an
+    array of indices or a boolean mask) selecting the pads to modify, all of them by default,
+    and values can be scalars or arrays broadcastable to the selection.
+    """
+    __slots__ = ('_reports',)
+
+    report_type: Type = None
+
+    def __init__(self, count: int) -> None:
+        self._reports = np.zeros(count, dtype=np.dtype(self.report_type))
+        self.reset()
+
+    @property
+    def reports(self) -> np.ndarray:
+        """The structured array holding the reports, one row per pad"""
+        return self._reports
+
+    def __len__(self) -> int:
+        return len(self._reports)
+
+    def _default_report(self):
+        return self.report_type()
+
+    def reset(self, index=None):
+        """Resets the reports to the default state"""
+        default = np.frombuffer(bytes(self._default_report()),
+                                dtype=self._reports.dtype)[0]
+        self._reports[_select(index)] = default
+
+    def press_button(self, button, index=None):
+        """
+        Presses buttons (no effect if already pressed)
+
+        :param: button, e.g. XUSB_BUTTON.XUSB_GAMEPAD_X, or an array with one value per selected pad
+        """
+        self._reports['wButtons'][_select(index)] |= _bits(button)
+
+    def release_button(self, button, index=None):
+        """
+        Releases buttons (no effect if already released)
+
+        :param: button, e.g. XUSB_BUTTON.XUSB_GAMEPAD_X, or an array with one value per selected pad
+        """
+        self._reports['wButtons'][_select(index)] &= ~_bits(button)
+
+    def left_trigger_float(self, value_float, index=None):
+        """
+        :param: float between 0.0 and 1.0 (0.0 = trigger released)
+        """
+        self._set_trigger(0, value_float, index)
+
+    def right_trigger_float(self, value_float, index=None):
+        """
+        :param: float between 0.0 and 1.0 (0.0 = trigger released)
+        """
+        self._set_trigger(1, value_float, index)
+
+    def _set_trigger(self, side: int, value_float, index):
+        raise NotImplementedError
+
+    def left_joystick_float(self, x_value_float, y_value_float, index=None):
+        """
+        :param: floats between -1.0 and 1.0 (0 = neutral position)
+        """
+        self._set_joystick('L', x_value_float, y_value_float, index)
+
+    def right_joystick_float(self, x_value_float, y_value_float, index=None):
+        """
+        :param: floats between -1.0 and 1.0 (0 = neutral position)
+        """
+        self._set_joystick('R', x_value_float, y_value_float, index)
+
+    def _set_joystick(self, side: str, x_value_float, y_value_float, index):
+        raise NotImplementedError
+
+    def directional_pad(self, direction, index=None):
+        """
+        Sets the direction of the directional pad (hat)
+
+        :param: a DS4_DPAD_DIRECTIONS field, or an array of them with one value per selected pad
+        """
+        raise NotImplementedError
+
+    def as_struct(self, index: int):
+        """
+        :return: the report of a pad as a ctypes structure sharing the array memory (no copy)
+        """
+        if index < 0:
+            index += len(self._reports)
+        if not 0 <= index < len(self._reports):
+            raise IndexError('pad index out of range')
+
+        return self.report_type.from_buffer(self._reports, index * self._reports.dtype.itemsize)
+
+    def push(self, index: int, gamepad: VGamepad):
+        """
+        Sends the report of a pad to a real virtual gamepad, without copying it
+        The report stored in the gamepad object is left untouched
+
+        :param: index, the pad whose report is sent
+        :param: gamepad, a VGamepad using the same report type
+        """
+        if not isinstance(gamepad._report, self.report_type):
+            raise TypeError(
+                f'{type(gamepad).__name__} does not use {self.report_type.__name__} reports')
+
+        report = self.as_struct(index)
+        try:
+            gamepad._send_on_bus(report)
+        except ViGemError as e:
+            gamepad._send_failed(report, e)
+            # a bus reconnection plugs the gamepad again with its own report, not this one
+            gamepad._send_on_bus(report)
+
+
+class BatchedX360State(BatchedState):
+    """Batched XUSB_REPORT, see BatchedState"""
+    __slots__ = ()
+
+    report_type = XUSB_REPORT
+
+    def _set_trigger(self, side: int, value_float, index):
+        field = 'bRightTrigger' if side else 'bLeftTrigger'
+        self._reports[field][_select(index)] = np.rint(
+            np.asarray(value_float) * 255).astype(np.uint8)
+
+    def _set_joystick(self, side: str, x_value_float, y_value_float, index):
+        selection = _select(index)
+        self._reports[f'sThumb{side}X'][selection] = np.rint(
+            np.asarray(x_value_float) * 32767).astype(np.int16)
+        self._reports[f'sThumb{side}Y'][selection] = np.rint(
+            np.asarray(y_value_float) * 32767).astype(np.int16)
+
+    def directional_pad(self, direction, index=None):
+        """
+        Sets the dpad buttons from a direction
+
+        :param: a DS4_DPAD_DIRECTIONS field, or an array of them with one value per selected pad
+        """
+        buttons = self._reports['wButtons']
+        selection = _select(index)
+        buttons[selection] = (buttons[selection] & ~X360_DPAD_MASK) | X360_DPAD_BUTTONS[
+            np.asarray(direction, dtype=np.intp)]
+
+
+class BatchedDS4State(BatchedState):
+    """Batched DS4_REPORT, see BatchedState"""
+    __slots__ = ()
+
+    report_type = DS4_REPORT
+
+    def _default_report(self):
+        report = DS4_REPORT()
+        DS4_REPORT_INIT(report)
+
+        return report
+
+    def press_special_button(self, special_button, index=None):
+        """
+        :param: a DS4_SPECIAL_BUTTONS field, or an array with one value per selected pad
+        """
+        self._reports['bSpecial'][_select(index)] |= np.asarray(
+            special_button, dtype=np.uint8)
+
+    def release_special_button(self, special_button, index=None):
+        """
+        :param: a DS4_SPECIAL_BUTTONS field, or an array with one value per selected pad
+        """
+        self._reports['bSpecial'][_select(index)] &= ~np.asarray(
+            special_button, dtype=np.uint8)
+
+    def _set_trigger(self, side: int, value_float, index):
+        field = 'bTriggerR' if side else 'bTriggerL'
+        self._reports[field][_select(index)] = np.rint(
+            np.asarray(value_float) * 255).astype(np.uint8)
+
+    def _set_joystick(self, side: str, x_value_float, y_value_float, index):
+        selection = _select(index)
+        self._reports[f'bThumb{side}X'][selection] = (
+            128 + np.rint(np.asarray(x_value_float) * 127)).astype(np.uint8)
+        self._reports[f'bThumb{side}Y'][selection] = (
+            128 + np.rint(np.asarray(y_value_float) * 127)).astype(np.uint8)
+
+    def directional_pad(self, direction, index=None):
+        """
+        :param: a DS4_DPAD_DIRECTIONS field, or an array of them with one value per selected pad
+        """
+        buttons = self._reports['wButtons']
+        selection = _select(index)
+        buttons[selection] = (buttons[selection] & np.uint16(0xFFF0)) | np.asarray(
+            direction, dtype=np.uint16)
@@ -1,37 +1,123 @@
+import threading
+import time
 from abc import ABC, abstractmethod
-from ctypes import CFUNCTYPE, Structure, c_ubyte, c_void_p
-from inspect import signature
+from contextlib import contextmanager
+from ctypes import Structure, addressof, memmove, sizeof
 
+from .. import registry
 from . import _sdk
 from .constants import VIGEM_TARGET_TYPE
-from .exceptions import ViGemBusConnectionError
-from .utils import dummy_callback
-from .vbus import VBus
+from .exceptions import (ViGemBusConnectionError, ViGemDeviceClosedError, ViGemError,
+                         ViGemTransientError)
+from .notification import NOTIFICATION_CALLBACK, NotificationStats, RumbleState, check_handler
+from .utils import DEFAULT_RETRY
+from .vbus import VBus, is_bus_error
 
 
 class VGamepad(ABC):
-    __slots__ = ('_bus_pointer', '_device_pointer',
-                 '_FUNC_TYPE', '_callback_func', '_report')
-
-    def __init__(self) -> None:
-        self._bus_pointer = VBus.getVBus().bus_pointer
+    __slots__ = ('_bus', '_bus_generation', '_bus_pointer', '_device_pointer',
+                 '_callback_func', '_report', '_presets',
+                 '_closed', '_lock', '_handlers', '_rumble',
+                 '_rumble_stats', '_min_interval', '_last_dispatch', '_dispatched',
+                 '_trailing', '_notification_lock', '__weakref__')
+
+    def __init__(self, thread_safe: bool = False, bus: VBus = None) -> None:
+        """
+        :param: thread_safe, when True the report can be modified from several threads,
+            read-modify-write operations are serialized by a per-device lock and `update`
+            sends a consistent copy of the report
+        :param: bus, the VBus to plug the device on (default: the shared one, see VBus.getVBus)
+        """
+        self._closed = True
+        self._trailing = None
+        self._bus = VBus.getVBus() if bus is None else bus
+        self._bus_generation = self._bus.generation
+        self._bus_pointer = self._bus.bus_pointer
         self._device_pointer = self._target_alloc()
-        self._FUNC_TYPE = CFUNCTYPE(
-            None, c_void_p, c_void_p, c_ubyte, c_ubyte, c_ubyte, c_void_p)
+        self._closed = False
+        registry.register(self)
         self._callback_func = None
+        self._handlers = ()
+        self._rumble = RumbleState()
+        self._rumble_stats = NotificationStats()
+        self._min_interval = 0.0
+        self._last_dispatch = float('-inf')
+        self._dispatched = None
+        self._notification_lock = threading.RLock()
+        self._presets = {}
 
         _sdk.vigem_target_add(self._bus_pointer, self._device_pointer)
 
         if not _sdk.vigem_target_is_attached(self._device_pointer):
             raise ViGemBusConnectionError(
                 "The virtual device could not connect to ViGEmBus.")
+        self._bus.attach(self)
 
         self._report = self._get_default_report()
+        self._lock = threading.RLock() if thread_safe else None
         self.update()
 
-    def __del__(self):
-        _sdk.vigem_target_remove(self._bus_pointer, self._device_pointer)
+    def close(self):
+        """
+        Unplugs the virtual device from the bus and frees it
+        Calling it more than once has no effect
+        """
+        if self._closed:
+            return
+
+        bus = self._bus
+        # not while the bus reconnects, it plugs the devices again
+        with bus._lock:
+            self._closed = True
+            self._cancel_trailing()
+            registry.unregister(self)
+            bus.detach(self)
+            # sends started before the flag was set may still use the target (see _send_on_bus)
+            while bus._sending:
+                time.sleep(0.0001)
+            _sdk.vigem_target_remove(self._bus_pointer, self._device_pointer)
+            _sdk.vigem_target_free(self._device_pointer)
+
+    @property
+    def bus(self) -> VBus:
+        return self._bus
+
+    def _reattach(self):
+        """
+        Plug the device again after its bus reconnected (see VBus.reconnect), with its last
+        report and notification handlers
+        """
+        # connected first, if it fails the old target is kept for the next attempt
+        bus_pointer = self._bus.bus_pointer
+        # the old target belongs to the lost connection
         _sdk.vigem_target_free(self._device_pointer)
+        self._bus_pointer = bus_pointer
+        self._device_pointer = self._target_alloc()
+        _sdk.vigem_target_add(self._bus_pointer, self._device_pointer)
+        if not _sdk.vigem_target_is_attached(self._device_pointer):
+            raise ViGemBusConnectionError(
+                "The virtual device could not connect to ViGEmBus.")
+        # plugged on the new client, update() sends through it again
+        self._bus_generation = self._bus.generation
+
+        if self._callback_func is not None:
+            self._register_notification()
+        # not through update, a failure here must not trigger another reconnection; the device
+        # lock is not taken, its holder may be waiting for the reconnection (see VBus.reattach)
+        DEFAULT_RETRY.call(self._send, self._report)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __del__(self):
+        self.close()
 
     @abstractmethod
     def _target_alloc(self):
@@ -48,11 +134,88 @@ class VGamepad(ABC):
         raise NotImplementedError
 
     @abstractmethod
+    def _send(self, report: Structure):
+        """
+        Sends a report to the virtual device (e.g. _sdk.vigem_target_x360_update)
+        """
+        raise NotImplementedError
+
     def update(self):
         """
         Sends the current report (i.e. commands) to the virtual device
         """
-        raise NotImplementedError
+        lock = self._lock
+        if lock is None:
+            report = self._report
+        else:
+            # copy under the lock, send outside of it so writers are not blocked by the driver;
+            # a copy per call, concurrent updates must not overwrite a report being sent
+            with lock:
+                report = self._report.__class__.from_buffer_copy(self._report)
+
+        try:
+            self._send_on_bus(report)
+        except ViGemError as e:
+            self._send_failed(report, e)
+
+    def _send_on_bus(self, report: Structure, send=None):
+        """
+        _send (or `send`), unless the bus is reconnecting: the reconnection frees the client it uses
+        """
+        bus = self._bus
+        sending = bus._sending
+        # registered before checking the generation and the closed flag, so a reconnection
+        # or close either waits for this send or is seen by it
+        sending.append(None)
+        try:
+            if self._closed:
+                raise ViGemDeviceClosedError('The device is closed')
+            if self._bus_generation == bus._generation:
+                if send is None:
+                    self._send(report)
+                else:
+                    send(report)
+                return
+        finally:
+            sending.pop()
+
+        # the bus is reconnecting, or its last reconnection could not plug this device
+        bus.reattach(self)
+
+    def _send_failed(self, report: Structure, error: ViGemError):
+        if isinstance(error, ViGemTransientError):
+            try:
+                DEFAULT_RETRY.call(self._send_on_bus, report)
+                return
+            except ViGemError as e:
+                error = e
+
+        if not is_bus_error(error):
+            raise error
+
+        # the connection is gone: reconnect the bus, which plugs every device again
+        # and sends their last report, this one included
+        if not self._bus.reconnect(self._bus_generation):
+            # already reconnected by another device, in the meantime
+            self._send_on_bus(report)
+
+    @property
+    def thread_safe(self) -> bool:
+        return self._lock is not None
+
+    @contextmanager
+    def locked(self):
+        """
+        Groups several modifications of the report so that `update` never sends them partially applied
+        Has no effect if the gamepad was not created with thread_safe=True
+        """
+        lock = self._lock
+        if lock is None:
+            yield self
+            return
+
+        with lock:
+            yield self
 
     def update_extended_report(self, extended_report: Structure):
         """
@@ -68,8 +231,56 @@ class VGamepad(ABC):
     def reset(self):
         """
         Resets the report to the default state
+        The report is overwritten in place, views of it (e.g. CompactReport.from_struct) stay valid
         """
-        self._report = self._get_default_report()
+        self.restore(bytes(self._get_default_report()))
+
+    def snapshot(self) -> bytes:
+        """
+        :return: a copy of the raw bytes of the current report
+        """
+        lock = self._lock
+        if lock is None:
+            return bytes(self._report)
+
+        with lock:
+            return bytes(self._report)
+
+    def restore(self, data: bytes):
+        """
+        Overwrites the current report in place with a previously taken snapshot
+        The report structure is not reallocated, the bytes are copied directly into it
+
+        :param: bytes returned by `snapshot` on a device of the same type
+        """
+        size = sizeof(self._report)
+        if len(data) != size:
+            raise ValueError(
+                f"Expected a snapshot of {size} bytes, but got {len(data)}")
+
+        lock = self._lock
+        if lock is None:
+            memmove(addressof(self._report), data, size)
+            return
+
+        with lock:
+            memmove(addressof(self._report), data, size)
+
+    def save_preset(self, name):
+        """
+        Stores a snapshot of the current report in a named slot
+
+        :param: the name of the preset slot
+        """
+        self._presets[name] = self.snapshot()
+
+    def load_preset(self, name):
+        """
+        Restores the report stored in a named slot (see `save_preset`)
+
+        :param: the name of the preset slot
+        """
+        self.restore(self._presets[name])
 
     def get_vid(self) -> int:
         """
@@ -112,14 +323,26 @@ class VGamepad(ABC):
         Presses a button (no effect if already pressed)
         :param: an int representing the button id, e.g. XUSB_BUTTON.XUSB_GAMEPAD_X or DS4_BUTTONS.DS4_BUTTON_TRIANGLE
         """
-        self._report.wButtons = self._report.wButtons | button
+        lock = self._lock
+        if lock is None:
+            self._report.wButtons |= button
+            return
+
+        with lock:
+            self._report.wButtons |= button
 
     def release_button(self, button: int):
         """
         Releases a button (no effect if already released)
         :param: an int representing the button id, e.g. XUSB_BUTTON.XUSB_GAMEPAD_X or DS4_BUTTONS.DS4_BUTTON_TRIANGLE
         """
-        self._report.wButtons = self._report.wButtons & ~button
+        lock = self._lock
+        if lock is None:
+            self._report.wButtons &= ~button
+            return
+
+        with lock:
+            self._report.wButtons &= ~button
 
     def press_special_button(self, special_button: int):
         """
@@ -228,23 +451,143 @@ class VGamepad(ABC):
         """
         raise NotImplementedError
 
-    def register_notification(self, callback_function):
+    def register_notification(self, callback_function=None, min_interval: float = 0.0):
         """
         Registers a callback function that can handle force feedback, leds, etc.
+        It replaces the handlers added before, see `add_notification_handler` to add more than one.
 
-        :param: a function of the form: my_func(client, target, large_motor, small_motor, led_number, user_data)
+        Consecutive identical notifications are dropped, and a change arriving less than
+        `min_interval` seconds after the last one passed to the handlers is delayed: when the
+        interval expires, the handlers get the latest state (from a timer thread), so a final
+        "motors off" is never lost. The last state is always available with `get_rumble_state`,
+        without a callback.
+
+        :param: a function of the form: my_func(client, target, large_motor, small_motor, led_number, user_data),
+            None to only track the state
+        :param: min_interval, minimum time in seconds between two calls of the handlers
         """
-        if not signature(callback_function) == signature(dummy_callback):
-            raise TypeError(
-                f"Needed callback function signature: {signature(dummy_callback)}, but got: {signature(callback_function)}")
+        if callback_function is not None:
+            check_handler(callback_function)
 
-        # keep its reference, otherwise the program will crash when a callback is made.
-        self._callback_func = self._FUNC_TYPE(callback_function)
-        self._register_notification()
+        self._handlers = () if callback_function is None else (callback_function,)
+        self._min_interval = min_interval
+        self._last_dispatch = float('-inf')
+        self._ensure_notification()
+
+    def add_notification_handler(self, handler):
+        """
+        Adds a handler to the notifications, without registering again with the driver
+
+        :param: a function of the form: my_func(client, target, large_motor, small_motor, led_number, user_data)
+        """
+        check_handler(handler)
+        # replaced, not modified, the driver thread may be iterating over it
+        self._handlers = self._handlers + (handler,)
+        self._ensure_notification()
+
+    def remove_notification_handler(self, handler):
+        """
+        Removes a handler added with `add_notification_handler` or `register_notification`
+        The state keeps being tracked, see `unregister_notification`
+        """
+        handlers = list(self._handlers)
+        handlers.remove(handler)
+        self._handlers = tuple(handlers)
+
+    def _ensure_notification(self):
+        if self._closed:
+            raise ViGemDeviceClosedError('The device is closed')
+        if self._callback_func is None:
+            # single trampoline per device, keep its reference, otherwise the program will
+            # crash when a callback is made.
+            self._callback_func = NOTIFICATION_CALLBACK(self._on_notification)
+            self._register_notification()
+
+    def _on_notification(self, client, target, large_motor, small_motor, led_number, user_data):
+        # the driver thread and the trailing timer decide and dispatch one at a time, so the
+        # handlers never run concurrently and always end on the latest state
+        with self._notification_lock:
+            stats = self._rumble_stats
+            stats.received += 1
+            state = self._rumble
+            if (large_motor == state.large_motor and small_motor == state.small_motor
+                    and led_number == state.led_number and state.timestamp):
+                stats.duplicates += 1
+                return
+
+            now = time.perf_counter()
+            # replaced as a whole, readers never see a partially updated state
+            self._rumble = state = RumbleState(large_motor, small_motor, led_number, now)
+
+            handlers = self._handlers
+            if not handlers:
+                return
+
+            wait = self._last_dispatch + self._min_interval - now
+            if wait > 0:
+                stats.decimated += 1
+                if self._trailing is None:
+                    # deliver the latest state when the interval expires
+                    timer = threading.Timer(
+                        wait, self._flush_notification, (client, target, user_data))
+                    timer.daemon = True
+                    self._trailing = timer
+                    timer.start()
+                return
+
+            self._dispatched = state
+            self._last_dispatch = now
+            stats.dispatched += 1
+            for handler in handlers:
+                handler(client, target, large_motor, small_motor, led_number, user_data)
+
+    def _flush_notification(self, client, target, user_data):
+        with self._notification_lock:
+            self._trailing = None
+            state = self._rumble
+            handlers = self._handlers
+            dispatched = self._dispatched
+            # already dispatched, or older than the last dispatched state
+            if not handlers or (dispatched is not None and state.timestamp <= dispatched.timestamp):
+                return
+
+            self._dispatched = state
+            self._last_dispatch = time.perf_counter()
+            self._rumble_stats.dispatched += 1
+            for handler in handlers:
+                handler(client, target, state.large_motor, state.small_motor, state.led_number, user_data)
+
+    def get_rumble_state(self) -> RumbleState:
+        """
+        Return the last force feedback state received from the driver
+
+        Needs `register_notification` to have been called (with or without callback).
+        """
+        return self._rumble
+
+    @property
+    def notification_stats(self) -> NotificationStats:
+        return self._rumble_stats
 
-    @abstractmethod
     def unregister_notification(self):
         """
         Unregisters a previously registered callback function.
         """
+        if self._callback_func is None:
+            return
+
+        if not self._closed:
+            # the target of a closed device is freed, with its notification registration
+            self._unregister_notification()
+        self._callback_func = None
+        self._handlers = ()
+        self._cancel_trailing()
+
+    def _cancel_trailing(self):
+        timer, self._trailing = self._trailing, None
+        if timer is not None:
+            timer.cancel()
+
+    @abstractmethod
+    def _unregister_notification(self):
         raise NotImplementedError
@@ -1,6 +1,128 @@
+from typing import Dict, Type
+
+from .constants import VIGEM_ERRORS
+
+
 class ViGemException(Exception):
     pass
 
 
 class ViGemBusConnectionError(ViGemException):
     pass
+
+
+class ViGemDeviceClosedError(ViGemException):
+    """The device was closed, it cannot be used to talk to the driver anymore"""
+    pass
+
+
+class ViGemError(ViGemException):
+    """Error code returned by a ViGEmClient function, see VIGEM_ERRORS"""
+
+    def __init__(self, code: int) -> None:
+        self.code = code
+        try:
+            name = VIGEM_ERRORS(code).name
+        except ValueError:
+            name = f'Unknown ViGEm error 0x{code:08X}'
+        super().__init__(name)
+
+
+class ViGemBusError(ViGemError):
+    """The connection to the bus is lost, it has to be re-created (see VBus.reconnect)"""
+    pass
+
+
+class ViGemTransientError(ViGemError):
+    """May succeed if the call is retried after a short delay (see RetryPolicy)"""
+    pass
+
+
+class ViGemBusNotFoundError(ViGemBusError):
+    pass
+
+
+class ViGemNoFreeSlotError(ViGemError):
+    pass
+
+
+class ViGemInvalidTargetError(ViGemError):
+    pass
+
+
+class ViGemRemovalFailedError(ViGemError):
+    pass
+
+
+class ViGemAlreadyConnectedError(ViGemError):
+    pass
+
+
+class ViGemTargetUninitializedError(ViGemError):
+    pass
+
+
+class ViGemTargetNotPluggedInError(ViGemBusError):
+    pass
+
+
+class ViGemBusVersionMismatchError(ViGemError):
+    pass
+
+
+class ViGemBusAccessFailedError(ViGemBusError, ViGemTransientError):
+    pass
+
+
+class ViGemCallbackAlreadyRegisteredError(ViGemError):
+    pass
+
+
+class ViGemCallbackNotFoundError(ViGemError):
+    pass
+
+
+class ViGemBusAlreadyConnectedError(ViGemError):
+    pass
+
+
+class ViGemBusInvalidHandleError(ViGemBusError):
+    pass
+
+
+class ViGemXusbUserIndexOutOfRangeError(ViGemError):
+    pass
+
+
+class ViGemInvalidParameterError(ViGemError):
+    pass
+
+
+class ViGemNotSupportedError(ViGemError):
+    pass
+
+
+# VIGEM_ERRORS code -> exception, as plain ints so the lookup does not go through the enum
+ERROR_EXCEPTIONS: Dict[int, Type[ViGemError]] = {
+    int(VIGEM_ERRORS.VIGEM_ERROR_BUS_NOT_FOUND): ViGemBusNotFoundError,
+    int(VIGEM_ERRORS.VIGEM_ERROR_NO_FREE_SLOT): ViGemNoFreeSlotError,
+    int(VIGEM_ERRORS.VIGEM_ERROR_INVALID_TARGET): ViGemInvalidTargetError,
+    int(VIGEM_ERRORS.VIGEM_ERROR_REMOVAL_FAILED): ViGemRemovalFailedError,
+    int(VIGEM_ERRORS.VIGEM_ERROR_ALREADY_CONNECTED): ViGemAlreadyConnectedError,
+    int(VIGEM_ERRORS.VIGEM_ERROR_TARGET_UNINITIALIZED): ViGemTargetUninitializedError,
+    int(VIGEM_ERRORS.VIGEM_ERROR_TARGET_NOT_PLUGGED_IN): ViGemTargetNotPluggedInError,
+    int(VIGEM_ERRORS.VIGEM_ERROR_BUS_VERSION_MISMATCH): ViGemBusVersionMismatchError,
+    int(VIGEM_ERRORS.VIGEM_ERROR_BUS_ACCESS_FAILED): ViGemBusAccessFailedError,
+    int(VIGEM_ERRORS.VIGEM_ERROR_CALLBACK_ALREADY_REGISTERED): ViGemCallbackAlreadyRegisteredError,
+    int(VIGEM_ERRORS.VIGEM_ERROR_CALLBACK_NOT_FOUND): ViGemCallbackNotFoundError,
+    int(VIGEM_ERRORS.VIGEM_ERROR_BUS_ALREADY_CONNECTED): ViGemBusAlreadyConnectedError,
+    int(VIGEM_ERRORS.VIGEM_ERROR_BUS_INVALID_HANDLE): ViGemBusInvalidHandleError,
+    int(VIGEM_ERRORS.VIGEM_ERROR_XUSB_USERINDEX_OUT_OF_RANGE): ViGemXusbUserIndexOutOfRangeError,
+    int(VIGEM_ERRORS.VIGEM_ERROR_INVALID_PARAMETER): ViGemInvalidParameterError,
+    int(VIGEM_ERRORS.VIGEM_ERROR_NOT_SUPPORTED): ViGemNotSupportedError,
+}
+
+
+def error_from_code(code: int) -> ViGemError:
+    """Return the exception matching a VIGEM_ERRORS code"""
+    return ERROR_EXCEPTIONS.get(code, ViGemError)(code)
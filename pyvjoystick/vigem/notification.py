@@ -0,0 +1,72 @@
+from ctypes import CFUNCTYPE, c_ubyte, c_void_p
+from inspect import signature
+from types import MethodType
+from typing import Callable, NamedTuple
+from weakref import WeakKeyDictionary
+
+from .utils import dummy_callback
+
+# prototype of the ViGEm notification callbacks, shared by every device
+NOTIFICATION_CALLBACK = CFUNCTYPE(
+    None, c_void_p, c_void_p, c_ubyte, c_ubyte, c_ubyte, c_void_p)
+
+_EXPECTED_SIGNATURE = signature(dummy_callback)
+# function -> [valid as a plain function, valid as a bound method]
+_checked = WeakKeyDictionary()
+
+
+def check_handler(handler: Callable):
+    """
+    Raise TypeError if `handler` does not have the signature of `dummy_callback`
+    The result is cached per function, so the signature is inspected only once
+    """
+    # bound methods are created on every attribute access, cache on their function, but apart
+    # from the function itself: binding removes the first parameter from the signature
+    bound = isinstance(handler, MethodType)
+    key = handler.__func__ if bound else handler
+    try:
+        results = _checked.get(key)
+    except TypeError:
+        results = None
+
+    valid = None if results is None else results[bound]
+    if valid is None:
+        valid = signature(handler) == _EXPECTED_SIGNATURE
+        try:
+            _checked.setdefault(key, [None, None])[bound] = valid
+        except TypeError:
+            pass
+
+    if not valid:
+        raise TypeError(
+            f"Needed callback function signature: {_EXPECTED_SIGNATURE}, but got: {signature(handler)}")
+
+
+class RumbleState(NamedTuple):
+    """Last force feedback state received from the driver"""
+    large_motor: int = 0
+    small_motor: int = 0
+    led_number: int = 0
+    # time.perf_counter() of the notification, 0.0 if nothing was received yet
+    timestamp: float = 0.0
+
+
+class NotificationStats:
+    """Counters of the driver notifications of a device"""
+    __slots__ = ('received', 'duplicates', 'decimated', 'dispatched')
+
+    def __init__(self) -> None:
+        self.received = 0
+        # identical to the previous notification, dropped
+        self.duplicates = 0
+        # a change arriving less than min_interval after the last dispatched one, delayed
+        self.decimated = 0
+        # passed to the user callback
+        self.dispatched = 0
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        values = ', '.join(f'{name}={getattr(self, name)}' for name in self.__slots__)
+        return f'{self.__class__.__name__}< {values} >'
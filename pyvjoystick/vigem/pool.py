@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Iterator, Type
+
+from .device import VGamepad
+from .notification import NotificationStats, RumbleState
+
+
+class VGamepadPool:
+    """
+    Pool of already attached virtual gamepads
+
+    Plugging a target into ViGEmBus blocks until the device is fully operational,
+    the pool keeps `min_size` idle gamepads ready so that leasing one does not pay that cost.
+    Gamepads are reset when returned (report, notification handlers and presets) and refilled
+    in a background thread.
+    """
+    __slots__ = ('_device_class', '_min_size', '_max_size', '_idle',
+                 '_leased', '_lock', '_refill_event', '_closed', '_refill_thread')
+
+    def __init__(self, device_class: Type[VGamepad], min_size: int = 1, max_size: int = 8):
+        """
+        :param: device_class, the gamepad class to instantiate, e.g. VX360Gamepad
+        :param: min_size, number of idle gamepads kept ready
+        :param: max_size, maximum number of gamepads (idle and leased) owned by the pool
+        """
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(
+                f"Invalid pool size: min_size={min_size}, max_size={max_size}")
+
+        self._device_class = device_class
+        self._min_size = min_size
+        self._max_size = max_size
+        self._idle: Deque[VGamepad] = deque()
+        self._leased = 0
+        self._lock = threading.Condition()
+        self._refill_event = threading.Event()
+        self._closed = False
+
+        self._refill_thread = threading.Thread(
+            target=self._refill_loop, name='VGamepadPool-refill', daemon=True)
+        self._refill_thread.start()
+        self._refill_event.set()
+
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+
+    @property
+    def leased(self) -> int:
+        return self._leased
+
+    def _needs_refill(self) -> bool:
+        return (not self._closed
+                and len(self._idle) < self._min_size
+                and len(self._idle) + self._leased < self._max_size)
+
+    def _refill_loop(self):
+        while True:
+            self._refill_event.wait()
+            self._refill_event.clear()
+
+            while True:
+                with self._lock:
+                    if not self._needs_refill():
+                        break
+                    # reserve the slot while the device is plugged in
+                    self._leased += 1
+
+                try:
+                    gamepad = self._device_class()
+                except Exception:
+                    with self._lock:
+                        self._leased -= 1
+                        self._lock.notify_all()
+                    break
+
+                with self._lock:
+                    self._leased -= 1
+                    if self._closed:
+                        gamepad.close()
+                        return
+                    self._idle.append(gamepad)
+                    self._lock.notify()
+
+            if self._closed:
+                return
+
+    def acquire(self, timeout: float = None) -> VGamepad:
+        """
+        Leases a gamepad from the pool
+        If there is no idle gamepad and the pool is not full a new one is created in the caller thread,
+        otherwise waits until one is returned
+
+        :param: timeout, maximum time in seconds to wait for a gamepad (None = wait forever)
+        :return: an attached gamepad in its default state
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The pool is closed")
+
+            while not self._idle and self._leased >= self._max_size:
+                if not self._lock.wait(timeout):
+                    raise TimeoutError("No gamepad available in the pool")
+
+            self._leased += 1
+            gamepad = self._idle.popleft() if self._idle else None
+
+        if gamepad is None:
+            try:
+                gamepad = self._device_class()
+            except Exception:
+                with self._lock:
+                    self._leased -= 1
+                    self._lock.notify()
+                raise
+
+        self._refill_event.set()
+
+        return gamepad
+
+    def release(self, gamepad: VGamepad):
+        """
+        Returns a leased gamepad to the pool, its report is reset and sent to the device,
+        and the notification handlers, rumble state and presets of the lessee are dropped.
+        If it cannot be reset, the gamepad is closed instead of going back to the pool.
+
+        :param: a gamepad obtained from `acquire`
+        """
+        reusable = False
+        try:
+            gamepad.unregister_notification()
+            gamepad._rumble = RumbleState()
+            gamepad._rumble_stats = NotificationStats()
+            gamepad._presets.clear()
+            gamepad.reset()
+            gamepad.update()
+            reusable = True
+        finally:
+            with self._lock:
+                self._leased -= 1
+                if reusable and not self._closed and len(self._idle) + self._leased < self._max_size:
+                    self._idle.append(gamepad)
+                    gamepad = None
+                self._lock.notify()
+
+            if gamepad is not None:
+                # the pool is full or closed, or the gamepad failed
+                gamepad.close()
+            self._refill_event.set()
+
+    @contextmanager
+    def lease(self, timeout: float = None) -> Iterator[VGamepad]:
+        """
+        Context manager version of `acquire`/`release`
+        """
+        gamepad = self.acquire(timeout)
+        try:
+            yield gamepad
+        finally:
+            self.release(gamepad)
+
+    def close(self):
+        """
+        Stops the refill thread and closes every idle gamepad
+        Leased gamepads are closed when they are released
+        """
+        with self._lock:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._lock.notify_all()
+
+        self._refill_event.set()
+
+        for gamepad in idle:
+            gamepad.close()
+
+    def __enter__(self) -> VGamepadPool:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
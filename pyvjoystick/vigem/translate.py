@@ -0,0 +1,299 @@
+from typing import List
+
+from .constants import (
+    DS4_BUTTONS,
+    DS4_DPAD_DIRECTIONS,
+    DS4_REPORT,
+    DS4_SPECIAL_BUTTONS,
+    XUSB_BUTTON,
+    XUSB_REPORT,
+)
+
+# Translation between XUSB_REPORT (Xbox 360) and DS4_REPORT (DualShock 4), through lookup tables
+# built once at import:
+#   sticks    int16 (-32768 - 32767) <-> byte (0 - 255, 128 = neutral), ends and center map exactly.
+#             XInput Y axes grow upwards and DS4 ones downwards, so Y values are inverted by
+#             default (invert_y=False keeps the raw direction, as the *_joystick_float setters do)
+#   buttons   XUSB wButtons is split in two bytes, each indexing a 256 entries table; the low byte
+#             holds the dpad, which becomes the DS4 hat nibble (opposite directions cancel)
+#   special   guide <-> PS, the DS4 touchpad click has no XUSB equivalent
+#   triggers  copied, the DS4 digital trigger buttons are pressed when the trigger is not 0
+
+# plain ints, operations on IntFlag members are slow
+_FACE_BUTTONS = tuple((int(x360), int(ds4)) for x360, ds4 in (
+    (XUSB_BUTTON.XUSB_GAMEPAD_A, DS4_BUTTONS.DS4_BUTTON_CROSS),
+    (XUSB_BUTTON.XUSB_GAMEPAD_B, DS4_BUTTONS.DS4_BUTTON_CIRCLE),
+    (XUSB_BUTTON.XUSB_GAMEPAD_X, DS4_BUTTONS.DS4_BUTTON_SQUARE),
+    (XUSB_BUTTON.XUSB_GAMEPAD_Y, DS4_BUTTONS.DS4_BUTTON_TRIANGLE),
+    (XUSB_BUTTON.XUSB_GAMEPAD_LEFT_SHOULDER, DS4_BUTTONS.DS4_BUTTON_SHOULDER_LEFT),
+    (XUSB_BUTTON.XUSB_GAMEPAD_RIGHT_SHOULDER, DS4_BUTTONS.DS4_BUTTON_SHOULDER_RIGHT),
+    (XUSB_BUTTON.XUSB_GAMEPAD_BACK, DS4_BUTTONS.DS4_BUTTON_SHARE),
+    (XUSB_BUTTON.XUSB_GAMEPAD_START, DS4_BUTTONS.DS4_BUTTON_OPTIONS),
+    (XUSB_BUTTON.XUSB_GAMEPAD_LEFT_THUMB, DS4_BUTTONS.DS4_BUTTON_THUMB_LEFT),
+    (XUSB_BUTTON.XUSB_GAMEPAD_RIGHT_THUMB, DS4_BUTTONS.DS4_BUTTON_THUMB_RIGHT),
+))
+
+_GUIDE = int(XUSB_BUTTON.XUSB_GAMEPAD_GUIDE)
+_PS = int(DS4_SPECIAL_BUTTONS.DS4_SPECIAL_BUTTON_PS)
+_TRIGGER_LEFT = int(DS4_BUTTONS.DS4_BUTTON_TRIGGER_LEFT)
+_TRIGGER_RIGHT = int(DS4_BUTTONS.DS4_BUTTON_TRIGGER_RIGHT)
+_DPAD_NONE = int(DS4_DPAD_DIRECTIONS.DS4_BUTTON_DPAD_NONE)
+_DPAD_UP = int(XUSB_BUTTON.XUSB_GAMEPAD_DPAD_UP)
+_DPAD_DOWN = int(XUSB_BUTTON.XUSB_GAMEPAD_DPAD_DOWN)
+_DPAD_LEFT = int(XUSB_BUTTON.XUSB_GAMEPAD_DPAD_LEFT)
+_DPAD_RIGHT = int(XUSB_BUTTON.XUSB_GAMEPAD_DPAD_RIGHT)
+
+# (vertical, horizontal) -> hat, vertical 1 = up, horizontal 1 = right
+_DIRECTIONS = {key: int(direction) for key, direction in {
+    (1, 0): DS4_DPAD_DIRECTIONS.DS4_BUTTON_DPAD_NORTH,
+    (1, 1): DS4_DPAD_DIRECTIONS.DS4_BUTTON_DPAD_NORTHEAST,
+    (0, 1): DS4_DPAD_DIRECTIONS.DS4_BUTTON_DPAD_EAST,
+    (-1, 1): DS4_DPAD_DIRECTIONS.DS4_BUTTON_DPAD_SOUTHEAST,
+    (-1, 0): DS4_DPAD_DIRECTIONS.DS4_BUTTON_DPAD_SOUTH,
+    (-1, -1): DS4_DPAD_DIRECTIONS.DS4_BUTTON_DPAD_SOUTHWEST,
+    (0, -1): DS4_DPAD_DIRECTIONS.DS4_BUTTON_DPAD_WEST,
+    (1, -1): DS4_DPAD_DIRECTIONS.DS4_BUTTON_DPAD_NORTHWEST,
+}.items()}
+
+
+def _stick_to_byte(value: int) -> int:
+    # rounded half up, -32768 -> 0, 0 -> 128, 32767 -> 255
+    if value >= 0:
+        return 128 + (254 * value + 32767) // 65534
+    return 128 + (value + 128) // 256
+
+
+def _byte_to_stick(value: int) -> int:
+    if value >= 128:
+        return round((value - 128) * 32767 / 127)
+    return round((value - 128) * 32768 / 128)
+
+
+def _stick_run_start(byte: int) -> int:
+    """Smallest int16 value mapped to `byte` by _stick_to_byte"""
+    if byte <= 128:
+        return max(-32768, 256 * (byte - 128) - 128)
+    return -((32767 - (byte - 128) * 65534) // 254)
+
+
+def _build_tables():
+    # _stick_to_byte is monotonic, so the 65536 entries table is made of 256 runs
+    starts = [_stick_run_start(byte) for byte in range(256)] + [32768]
+    # values in signed order, from -32768 to 32767
+    signed = b''.join(bytes((byte,)) * (starts[byte + 1] - starts[byte]) for byte in range(256))
+    # Y inverted: -value, with -(-32768) clamped to 32767
+    signed_inverted = signed[-1:] + signed[:0:-1]
+    # indexed by the int16 value as unsigned (value & 0xFFFF)
+    stick_to_ds4 = signed[32768:] + signed[:32768]
+    stick_to_ds4_inverted = signed_inverted[32768:] + signed_inverted[:32768]
+
+    ds4_to_stick = [_byte_to_stick(value) for value in range(256)]
+    ds4_to_stick_inverted = [min(-_byte_to_stick(value), 32767) for value in range(256)]
+
+    # XUSB wButtons low / high byte -> DS4 wButtons (hat included in the low one) | bSpecial << 16
+    x360_lo = []
+    x360_hi = []
+    for byte in range(256):
+        for table, shift in ((x360_lo, 0), (x360_hi, 8)):
+            buttons = byte << shift
+            ds4 = 0
+            for x360_button, ds4_button in _FACE_BUTTONS:
+                if buttons & x360_button:
+                    ds4 |= ds4_button
+            if buttons & _GUIDE:
+                ds4 |= _PS << 16
+            if shift == 0:
+                vertical = bool(buttons & _DPAD_UP) - bool(buttons & _DPAD_DOWN)
+                horizontal = bool(buttons & _DPAD_RIGHT) - bool(buttons & _DPAD_LEFT)
+                ds4 |= _DIRECTIONS.get((vertical, horizontal), _DPAD_NONE)
+            table.append(ds4)
+
+    # DS4 wButtons low / high byte -> XUSB wButtons (hat nibble included in the low one)
+    hat_to_x360 = [0] * 16
+    for (vertical, horizontal), direction in _DIRECTIONS.items():
+        bits = 0
+        if vertical > 0:
+            bits |= _DPAD_UP
+        elif vertical < 0:
+            bits |= _DPAD_DOWN
+        if horizontal > 0:
+            bits |= _DPAD_RIGHT
+        elif horizontal < 0:
+            bits |= _DPAD_LEFT
+        hat_to_x360[direction] = bits
+
+    ds4_lo = []
+    ds4_hi = []
+    for byte in range(256):
+        for table, shift in ((ds4_lo, 0), (ds4_hi, 8)):
+            buttons = byte << shift
+            x360 = hat_to_x360[byte & 0xF] if shift == 0 else 0
+            for x360_button, ds4_button in _FACE_BUTTONS:
+                if buttons & ds4_button:
+                    x360 |= x360_button
+            table.append(x360)
+
+    return (stick_to_ds4, stick_to_ds4_inverted, ds4_to_stick,
+            ds4_to_stick_inverted, x360_lo, x360_hi, ds4_lo, ds4_hi)
+
+
+(STICK_TO_DS4, STICK_TO_DS4_INVERTED, DS4_TO_STICK, DS4_TO_STICK_INVERTED,
+ X360_LO_TO_DS4, X360_HI_TO_DS4, DS4_LO_TO_X360, DS4_HI_TO_X360) = _build_tables()
+
+
+def x360_to_ds4(report: XUSB_REPORT, out: DS4_REPORT = None, invert_y: bool = True) -> DS4_REPORT:
+    """
+    Translate a XUSB_REPORT to a DS4_REPORT
+
+    :param out: the report to write into (e.g. the report of a VDS4Gamepad), default: a new one
+    :return: out
+    """
+    if out is None:
+        out = DS4_REPORT()
+
+    y_table = STICK_TO_DS4_INVERTED if invert_y else STICK_TO_DS4
+    out.bThumbLX = STICK_TO_DS4[report.sThumbLX & 0xFFFF]
+    out.bThumbLY = y_table[report.sThumbLY & 0xFFFF]
+    out.bThumbRX = STICK_TO_DS4[report.sThumbRX & 0xFFFF]
+    out.bThumbRY = y_table[report.sThumbRY & 0xFFFF]
+
+    buttons = report.wButtons
+    value = X360_LO_TO_DS4[buttons & 0xFF] | X360_HI_TO_DS4[buttons >> 8]
+    left = report.bLeftTrigger
+    right = report.bRightTrigger
+    if left:
+        value |= _TRIGGER_LEFT
+    if right:
+        value |= _TRIGGER_RIGHT
+    out.wButtons = value & 0xFFFF
+    out.bSpecial = value >> 16
+    out.bTriggerL = left
+    out.bTriggerR = right
+
+    return out
+
+
+def ds4_to_x360(report: DS4_REPORT, out: XUSB_REPORT = None, invert_y: bool = True) -> XUSB_REPORT:
+    """
+    Translate a DS4_REPORT to a XUSB_REPORT
+
+    :param out: the report to write into (e.g. the report of a VX360Gamepad), default: a new one
+    :return: out
+    """
+    if out is None:
+        out = XUSB_REPORT()
+
+    y_table = DS4_TO_STICK_INVERTED if invert_y else DS4_TO_STICK
+    out.sThumbLX = DS4_TO_STICK[report.bThumbLX]
+    out.sThumbLY = y_table[report.bThumbLY]
+    out.sThumbRX = DS4_TO_STICK[report.bThumbRX]
+    out.sThumbRY = y_table[report.bThumbRY]
+
+    buttons = report.wButtons
+    value = DS4_LO_TO_X360[buttons & 0xFF] | DS4_HI_TO_X360[buttons >> 8]
+    if report.bSpecial & _PS:
+        value |= _GUIDE
+    out.wButtons = value
+    out.bLeftTrigger = report.bTriggerL
+    out.bRightTrigger = report.bTriggerR
+
+    return out
+
+
+def mirror(source, target, invert_y: bool = True):
+    """
+    Copy the state of a gamepad to a gamepad of the other type (VX360Gamepad <-> VDS4Gamepad)
+    and send it; a gamepad of the same type gets a plain copy
+    """
+    source_report = source._report
+    with target.locked():
+        target_report = target._report
+        if type(source_report) is type(target_report):
+            target.restore(bytes(source_report))
+        elif isinstance(source_report, XUSB_REPORT):
+            x360_to_ds4(source_report, target_report, invert_y)
+        else:
+            ds4_to_x360(source_report, target_report, invert_y)
+    target.update()
+
+
+_np_tables: List = []
+
+
+def _array_tables():
+    if not _np_tables:
+        import numpy as np
+
+        _np_tables.extend([
+            np.frombuffer(STICK_TO_DS4, dtype=np.uint8),
+            np.frombuffer(STICK_TO_DS4_INVERTED, dtype=np.uint8),
+            np.array(DS4_TO_STICK, dtype=np.int16),
+            np.array(DS4_TO_STICK_INVERTED, dtype=np.int16),
+            np.array(X360_LO_TO_DS4, dtype=np.uint32),
+            np.array(X360_HI_TO_DS4, dtype=np.uint32),
+            np.array(DS4_LO_TO_X360, dtype=np.uint16),
+            np.array(DS4_HI_TO_X360, dtype=np.uint16),
+        ])
+
+    return _np_tables
+
+
+def x360_to_ds4_array(reports, invert_y: bool = True):
+    """
+    Translate a structured array of XUSB_REPORT (e.g. BatchedX360State.reports) to DS4_REPORT
+
+    :return: a new structured array with the dtype of DS4_REPORT
+    """
+    import numpy as np
+
+    stick, stick_inverted, _, _, lo, hi, _, _ = _array_tables()
+    y_table = stick_inverted if invert_y else stick
+    out = np.zeros(len(reports), dtype=np.dtype(DS4_REPORT))
+
+    def index(field):
+        return reports[field].view(np.uint16)
+
+    out['bThumbLX'] = stick[index('sThumbLX')]
+    out['bThumbLY'] = y_table[index('sThumbLY')]
+    out['bThumbRX'] = stick[index('sThumbRX')]
+    out['bThumbRY'] = y_table[index('sThumbRY')]
+
+    buttons = reports['wButtons']
+    value = lo[buttons & 0xFF] | hi[buttons >> 8]
+    left = reports['bLeftTrigger']
+    right = reports['bRightTrigger']
+    value |= np.where(left != 0, _TRIGGER_LEFT, 0).astype(np.uint32)
+    value |= np.where(right != 0, _TRIGGER_RIGHT, 0).astype(np.uint32)
+    out['wButtons'] = value & 0xFFFF
+    out['bSpecial'] = value >> 16
+    out['bTriggerL'] = left
+    out['bTriggerR'] = right
+
+    return out
+
+
+def ds4_to_x360_array(reports, invert_y: bool = True):
+    """
+    Translate a structured array of DS4_REPORT (e.g. BatchedDS4State.reports) to XUSB_REPORT
+
+    :return: a new structured array with the dtype of XUSB_REPORT
+    """
+    import numpy as np
+
+    _, _, stick, stick_inverted, _, _, lo, hi = _array_tables()
+    y_table = stick_inverted if invert_y else stick
+    out = np.zeros(len(reports), dtype=np.dtype(XUSB_REPORT))
+
+    out['sThumbLX'] = stick[reports['bThumbLX']]
+    out['sThumbLY'] = y_table[reports['bThumbLY']]
+    out['sThumbRX'] = stick[reports['bThumbRX']]
+    out['sThumbRY'] = y_table[reports['bThumbRY']]
+
+    buttons = reports['wButtons']
+    value = lo[buttons & 0xFF] | hi[buttons >> 8]
+    value |= np.where(reports['bSpecial'] & _PS, _GUIDE, 0).astype(np.uint16)
+    out['wButtons'] = value
+    out['bLeftTrigger'] = reports['bTriggerL']
+    out['bRightTrigger'] = reports['bTriggerR']
+
+    return out
@@ -1,9 +1,55 @@
+import time
+
 from . import constants
+from .exceptions import ViGemTransientError, error_from_code
+
+# plain int, comparing to an IntEnum member is slower and this runs on every update
+VIGEM_ERROR_NONE = int(constants.VIGEM_ERRORS.VIGEM_ERROR_NONE)
 
 
 def check_err(err):
-    if err != constants.VIGEM_ERRORS.VIGEM_ERROR_NONE:
-        raise Exception(constants.VIGEM_ERRORS(err).name)
+    """Raise the ViGemError subclass matching a VIGEM_ERRORS code, if it is not VIGEM_ERROR_NONE"""
+    if err != VIGEM_ERROR_NONE:
+        raise error_from_code(err)
+
+
+class RetryPolicy:
+    """
+    Retries a call raising a ViGemTransientError (e.g. VIGEM_ERROR_BUS_ACCESS_FAILED), with
+    exponential backoff. Any other error is raised immediately.
+    """
+    __slots__ = ('attempts', 'delay', 'backoff', 'max_delay')
+
+    def __init__(self, attempts: int = 3, delay: float = 0.001, backoff: float = 2.0,
+                 max_delay: float = 0.1) -> None:
+        """
+        :param attempts: number of calls, the first one included
+        :param delay: seconds to wait before the first retry
+        :param backoff: factor applied to the delay after every retry
+        :param max_delay: upper bound of the delay
+        """
+        self.attempts = attempts
+        self.delay = delay
+        self.backoff = backoff
+        self.max_delay = max_delay
+
+    def call(self, func, *args):
+        delay = self.delay
+        for _ in range(self.attempts - 1):
+            try:
+                return func(*args)
+            except ViGemTransientError:
+                time.sleep(delay)
+                delay = min(delay * self.backoff, self.max_delay)
+
+        return func(*args)
+
+    def __repr__(self) -> str:
+        return (f'{self.__class__.__name__}< attempts={self.attempts}, delay={self.delay}, '
+                f'backoff={self.backoff}, max_delay={self.max_delay} >')
+
+
+DEFAULT_RETRY = RetryPolicy()
 
 
 def dummy_callback(client, target, large_motor, small_motor, led_number, user_data):
@@ -1,54 +1,203 @@
 from __future__ import annotations
 
+import threading
+import time
+from collections import deque
+from typing import List
+from weakref import WeakSet
+
 from . import _sdk
-from .utils import check_err
+from .exceptions import ViGemBusError
+from .utils import DEFAULT_RETRY, check_err
+
+
+def is_bus_error(error: Exception) -> bool:
+    """Return True if an error raised by check_err means the bus connection must be re-created"""
+    return isinstance(error, ViGemBusError)
 
 
-# We instantiate a single global VBus for all controllers
 class VBus:
     """
-    Virtual USB bus (ViGEmBus)
+    Virtual USB bus (ViGEmBus), a client connection to the driver
+
+    `getVBus` returns the default bus shared by the devices created without a bus. More buses
+    (client connections) can be created, see VBusManager. A bus keeps track of the devices
+    attached to it, so that `reconnect` can plug them again on a new connection.
     """
-    __slots__ = ('_bus_pointer',)
+    __slots__ = ('_bus_pointer', '_targets', '_lock', '_generation', '_sending', '__weakref__')
     __shared_instance: VBus = None
+    __shared_lock = threading.Lock()
 
     @staticmethod
     def getVBus() -> VBus:
         """Static Access Method"""
         if VBus.__shared_instance is None:
-            VBus()
+            with VBus.__shared_lock:
+                if VBus.__shared_instance is None:
+                    VBus.__shared_instance = VBus()
 
         return VBus.__shared_instance
 
     def __init__(self):
-        """virtual private constructor"""
-        if VBus.__shared_instance is not None:
-            raise Exception("This class is a singleton class !")
-
-        VBus.__shared_instance = self
-
         self._bus_pointer = None
+        self._targets = WeakSet()
+        self._lock = threading.RLock()
+        # incremented by every reconnection
+        self._generation = 0
+        # one entry per report being sent (deque append/pop are atomic), a reconnection waits
+        # for them before freeing the client
+        self._sending = deque()
 
     def _init_bus(self):
-        self._bus_pointer = _sdk.vigem_alloc()
-        check_err(_sdk.vigem_connect(self._bus_pointer))
+        bus_pointer = _sdk.vigem_alloc()
+        try:
+            DEFAULT_RETRY.call(self._connect, bus_pointer)
+        except Exception:
+            _sdk.vigem_free(bus_pointer)
+            raise
+        self._bus_pointer = bus_pointer
+
+    @staticmethod
+    def _connect(bus_pointer):
+        check_err(_sdk.vigem_connect(bus_pointer))
 
     @property
     def bus_pointer(self):
         if self._bus_pointer is None:
-            self._init_bus()
+            with self._lock:
+                if self._bus_pointer is None:
+                    self._init_bus()
 
         return self._bus_pointer
 
     def get_bus_pointer(self):
-        if self._bus_pointer is None:
+        return self.bus_pointer
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    @property
+    def targets(self) -> List:
+        """The devices currently attached to this bus"""
+        return list(self._targets)
+
+    def __len__(self) -> int:
+        return len(self._targets)
+
+    def attach(self, gamepad):
+        """Track a device plugged on this bus (called by VGamepad)"""
+        self._targets.add(gamepad)
+
+    def detach(self, gamepad):
+        self._targets.discard(gamepad)
+
+    def reattach(self, gamepad):
+        """
+        Called by a device that could not send because of a reconnection, waits for it to end
+        and plugs the device again if the reconnection could not
+        """
+        with self._lock:
+            if gamepad._bus_generation != self._generation and not gamepad.closed:
+                gamepad._reattach()
+
+    def reconnect(self, generation: int = None) -> bool:
+        """
+        Re-create the client connection and plug every attached device again with its last report
+
+        :param generation: the generation the caller saw failing, if the bus was reconnected since
+            then (e.g. by another device hitting the same error) nothing is done
+        :return: True if the bus was reconnected
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return False
+
+            # incremented first: new sends see the devices are stale and back off (see
+            # VGamepad._send_on_bus), the running ones still use the client, it must not be
+            # freed under them
+            self._generation += 1
+            while self._sending:
+                time.sleep(0.0001)
+
+            self._disconnect()
             self._init_bus()
 
-        return self._bus_pointer
+            error = None
+            for gamepad in list(self._targets):
+                if gamepad.closed:
+                    continue
+                try:
+                    gamepad._reattach()
+                except Exception as e:
+                    # plug the other devices anyway
+                    error = error or e
 
-    def __del__(self):
-        if self._bus_pointer is None:
+        if error is not None:
+            raise error
+
+        return True
+
+    def _disconnect(self):
+        bus_pointer, self._bus_pointer = self._bus_pointer, None
+        if bus_pointer is None:
             return
 
-        _sdk.vigem_disconnect(self._bus_pointer)
-        _sdk.vigem_free(self._bus_pointer)
+        _sdk.vigem_disconnect(bus_pointer)
+        _sdk.vigem_free(bus_pointer)
+
+    def close(self):
+        """Disconnect from the driver, the devices still attached are closed"""
+        with self._lock:
+            for gamepad in list(self._targets):
+                gamepad.close()
+            self._disconnect()
+
+        if VBus.__shared_instance is self:
+            VBus.__shared_instance = None
+
+    def __del__(self):
+        self._disconnect()
+
+
+class VBusManager:
+    """
+    Several client connections to ViGEmBus, with the devices sharded across them
+
+        manager = VBusManager(buses=4)
+        gamepads = [manager.create(VX360Gamepad) for _ in range(32)]
+    """
+    __slots__ = ('_buses',)
+
+    def __init__(self, buses: int = 2) -> None:
+        if buses < 1:
+            raise ValueError('At least one bus is needed')
+
+        self._buses = [VBus() for _ in range(buses)]
+
+    @property
+    def buses(self) -> List[VBus]:
+        return list(self._buses)
+
+    def get_bus(self) -> VBus:
+        """Return the bus with the fewest devices attached"""
+        return min(self._buses, key=len)
+
+    def create(self, device_class, *args, **kwargs):
+        """Create a device (e.g. VX360Gamepad) on the least loaded bus"""
+        return device_class(*args, bus=self.get_bus(), **kwargs)
+
+    def reconnect(self):
+        """Reconnect every bus, see VBus.reconnect"""
+        for bus in self._buses:
+            bus.reconnect()
+
+    def close(self):
+        for bus in self._buses:
+            bus.close()
+
+    def __enter__(self) -> VBusManager:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
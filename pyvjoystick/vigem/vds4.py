@@ -31,12 +31,9 @@ class VDS4Gamepad(VGamepad):
 
         return rep
 
-    def update(self):
-        """
-        Sends the current report (i.e. commands) to the virtual device
-        """
+    def _send(self, report: DS4_REPORT):
         check_err(_sdk.vigem_target_ds4_update(
-            self._bus_pointer, self._device_pointer, self._report))
+            self._bus_pointer, self._device_pointer, report))
 
     def update_extended_report(self, extended_report: DS4_REPORT_EX):
         """
@@ -45,6 +42,9 @@ class VDS4Gamepad(VGamepad):
 
         :param: a DS4_REPORT_EX
         """
+        self._send_on_bus(extended_report, self._send_extended)
+
+    def _send_extended(self, extended_report: DS4_REPORT_EX):
         check_err(_sdk.vigem_target_ds4_update_ex(
             self._bus_pointer, self._device_pointer, extended_report))
 
@@ -55,7 +55,13 @@ class VDS4Gamepad(VGamepad):
 
         :param: a DS4_SPECIAL_BUTTONS field, e.g. DS4_SPECIAL_BUTTONS.DS4_SPECIAL_BUTTON_TOUCHPAD
         """
-        self._report.bSpecial = self._report.bSpecial | special_button
+        lock = self._lock
+        if lock is None:
+            self._report.bSpecial |= special_button
+            return
+
+        with lock:
+            self._report.bSpecial |= special_button
 
     def release_special_button(self, special_button: int):
         """
@@ -64,7 +70,13 @@ class VDS4Gamepad(VGamepad):
 
         :param: a DS4_SPECIAL_BUTTONS field, e.g. DS4_SPECIAL_BUTTONS.DS4_SPECIAL_BUTTON_TOUCHPAD
         """
-        self._report.bSpecial = self._report.bSpecial & ~special_button
+        lock = self._lock
+        if lock is None:
+            self._report.bSpecial &= ~special_button
+            return
+
+        with lock:
+            self._report.bSpecial &= ~special_button
 
     def left_trigger(self, value: int):
         """
@@ -125,14 +137,17 @@ class VDS4Gamepad(VGamepad):
 
         :param: a DS4_DPAD_DIRECTIONS field, e.g. DS4_DPAD_DIRECTIONS.DS4_BUTTON_DPAD_NORTHWEST
         """
-        DS4_SET_DPAD(self._report, direction)
+        lock = self._lock
+        if lock is None:
+            DS4_SET_DPAD(self._report, direction)
+            return
+
+        with lock:
+            DS4_SET_DPAD(self._report, direction)
 
     def _register_notification(self):
         check_err(_sdk.vigem_target_ds4_register_notification(
             self._bus_pointer, self._device_pointer, self._callback_func, None))
 
-    def unregister_notification(self):
-        """
-        Unregisters a previously registered callback function.
-        """
+    def _unregister_notification(self):
         _sdk.vigem_target_ds4_unregister_notification(self._device_pointer)
@@ -1,14 +1,15 @@
 from . import _sdk
 from .constants import XUSB_REPORT
 from .device import VGamepad
+from .vbus import VBus
 from .utils import check_err
 
 
 class VX360Gamepad(VGamepad):
     __slots__ = ()
 
-    def __init__(self) -> None:
-        super().__init__()
+    def __init__(self, thread_safe: bool = False, bus: VBus = None) -> None:
+        super().__init__(thread_safe, bus)
 
     def _target_alloc(self):
         return _sdk.vigem_target_x360_alloc()
@@ -23,12 +24,9 @@ class VX360Gamepad(VGamepad):
             sThumbRX=0,
             sThumbRY=0)
 
-    def update(self):
-        """
-        Sends the current report (i.e. commands) to the virtual device
-        """
+    def _send(self, report: XUSB_REPORT):
         check_err(_sdk.vigem_target_x360_update(
-            self._bus_pointer, self._device_pointer, self._report))
+            self._bus_pointer, self._device_pointer, report))
 
     def left_trigger(self, value: int):
         """
@@ -86,8 +84,5 @@ class VX360Gamepad(VGamepad):
         check_err(_sdk.vigem_target_x360_register_notification(
             self._bus_pointer, self._device_pointer, self._callback_func, None))
 
-    def unregister_notification(self):
-        """
-        Unregisters a previously registered callback function.
-        """
+    def _unregister_notification(self):
         _sdk.vigem_target_x360_unregister_notification(self._device_pointer)
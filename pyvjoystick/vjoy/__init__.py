@@ -1,4 +1,7 @@
 from .constants import HID_USAGE, JOYSTICK_API_VERSION, VJD_STATUS
+from .discovery import DeviceInfo, DeviceWatcher, acquire_first_free, enumerate_devices
 from .vjoydevice import VJoyDevice
+from .watchdog import DeviceWatchdog
 
-__all__ = ['VJoyDevice', 'HID_USAGE', 'JOYSTICK_API_VERSION', 'VJD_STATUS']
+__all__ = ['VJoyDevice', 'HID_USAGE', 'JOYSTICK_API_VERSION', 'VJD_STATUS',
+           'DeviceInfo', 'DeviceWatcher', 'acquire_first_free', 'enumerate_devices', 'DeviceWatchdog']
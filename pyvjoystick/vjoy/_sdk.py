@@ -1,4 +1,3 @@
-import sys
 from ctypes import CDLL, Structure, c_byte, c_int, c_long, cdll, pointer, wintypes
 from pathlib import Path
 from typing import Dict
@@ -7,6 +6,7 @@ from ..utils import lazy_eval
 from .constants import DLL_FILENAME, HID_USAGE, JOYSTICK_API_VERSION, VJD_STATUS
 from .exceptions import (
     vJoyButtonException,
+    vJoyDllLoadException,
     vJoyDriverMismatchException,
     vJoyException,
     vJoyFailedToAcquireException,
@@ -19,21 +19,21 @@ from .exceptions import (
 )
 from .utils import get_api_version, get_dll_path
 
-_dll_path = str(Path(get_dll_path()) / DLL_FILENAME)
 
+def _load_sdk():
+    _dll_path = str(Path(get_dll_path()) / DLL_FILENAME)
 
-def _load_sdk(_dll_path: str):
     try:
         _vj: CDLL = cdll.LoadLibrary(_dll_path)
     except OSError:
-        sys.exit(
-            f"Unable to load vJoy SDK DLL.  Ensure that {DLL_FILENAME} is present")
+        raise vJoyDllLoadException(
+            f"Unable to load vJoy SDK DLL.  Ensure that {DLL_FILENAME} is present") from None
 
     return _vj
 
 
-# lazy load sdk, is loaded the first time is used
-_vj = lazy_eval(locals(), '_vj', _load_sdk, _dll_path)
+# lazy load sdk, the registry is read and the dll is loaded the first time is used
+_vj = lazy_eval(globals(), '_vj', _load_sdk)
 
 
 def GetNumberExistingVJD() -> int:
@@ -79,7 +79,10 @@ def GetVJDStatus(rID) -> VJD_STATUS:
     """Get the status of a given vJoy Device"""
     status: int = _vj.GetVJDStatus(rID)
 
-    return list(VJD_STATUS)[status]
+    try:
+        return VJD_STATUS(status)
+    except ValueError:
+        return VJD_STATUS.UNKN
 
 
 def AcquireVJD(rID):
@@ -0,0 +1,138 @@
+import threading
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+from . import _sdk
+from .constants import HID_USAGE, VJD_STATUS
+from .exceptions import vJoyFailedToAcquireException
+from .vjoydevice import VJoyDevice
+
+
+class DeviceInfo(NamedTuple):
+    """Status and capabilities of a vJoy device slot"""
+    rID: int
+    status: VJD_STATUS
+    number_of_buttons: int = 0
+    number_of_disc_povs: int = 0
+    number_of_cont_povs: int = 0
+    axes: Tuple[HID_USAGE, ...] = ()
+
+    @property
+    def free(self) -> bool:
+        return self.status == VJD_STATUS.FREE
+
+
+def _device_info(rID: int, status: VJD_STATUS) -> DeviceInfo:
+    if status == VJD_STATUS.MISS:
+        # not configured, there are no capabilities to read
+        return DeviceInfo(rID, status)
+
+    return DeviceInfo(
+        rID, status,
+        _sdk.GetVJDButtonNumber(rID),
+        _sdk.GetVJDDiscPovNumber(rID),
+        _sdk.GetVJDContPovNumber(rID),
+        tuple(hid for hid in HID_USAGE if _sdk.GetVJDAxisExist(rID, hid.value)))
+
+
+def enumerate_devices() -> List[DeviceInfo]:
+    """Return the status and capabilities of every vJoy device slot, in rID order"""
+    return [_device_info(rID, _sdk.GetVJDStatus(rID))
+            for rID in range(1, _sdk.GetvJoyMaxDevices() + 1)]
+
+
+def refresh_devices(devices: Sequence[DeviceInfo]) -> List[DeviceInfo]:
+    """
+    Return an updated copy of a table returned by enumerate_devices
+    Only the status is read, capabilities are read again only for the slots appearing or disappearing
+    """
+    table = []
+    for info in devices:
+        status = _sdk.GetVJDStatus(info.rID)
+        if status == info.status:
+            table.append(info)
+        elif VJD_STATUS.MISS in (status, info.status):
+            table.append(_device_info(info.rID, status))
+        else:
+            table.append(info._replace(status=status))
+
+    return table
+
+
+def acquire_first_free(devices: Sequence[DeviceInfo] = None, **kwargs) -> VJoyDevice:
+    """
+    Acquire the first free vJoy device
+
+    :param devices: a table returned by enumerate_devices or DeviceWatcher.devices (default: a new one)
+    :param kwargs: passed to VJoyDevice, e.g. thread_safe
+    """
+    if devices is None:
+        devices = enumerate_devices()
+
+    for info in devices:
+        if not info.free:
+            continue
+
+        try:
+            return VJoyDevice(info.rID, **kwargs)
+        except vJoyFailedToAcquireException:
+            # taken by another application since the table was read
+            continue
+
+    raise vJoyFailedToAcquireException('No free vJoy device')
+
+
+class DeviceWatcher:
+    """
+    Keeps a table of the vJoy device slots refreshed by a background thread
+
+        with DeviceWatcher(interval=1.0) as watcher:
+            device = acquire_first_free(watcher.devices)
+    """
+
+    def __init__(self, interval: float = 1.0,
+                 on_change: Optional[Callable[[List[DeviceInfo]], None]] = None) -> None:
+        """
+        :param interval: seconds between two refreshes
+        :param on_change: called from the watcher thread with the new table when it changes
+        """
+        self._interval = interval
+        self._on_change = on_change
+        self._devices = enumerate_devices()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name=self.__class__.__name__, daemon=True)
+        self._thread.start()
+
+    @property
+    def devices(self) -> List[DeviceInfo]:
+        """The last table read, refreshed every `interval` seconds"""
+        return self._devices
+
+    def free_devices(self) -> List[DeviceInfo]:
+        return [info for info in self._devices if info.free]
+
+    def refresh(self) -> List[DeviceInfo]:
+        """Refresh the table now"""
+        devices = refresh_devices(self._devices)
+        changed = devices != self._devices
+        # replaced as a whole, readers never see a partially refreshed table
+        self._devices = devices
+        if changed and self._on_change is not None:
+            self._on_change(devices)
+
+        return devices
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            self.refresh()
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def __enter__(self) -> 'DeviceWatcher':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -11,6 +11,14 @@ class vJoyNotEnabledException(vJoyException):
     pass
 
 
+class vJoyNotInstalledException(vJoyException):
+    pass
+
+
+class vJoyDllLoadException(vJoyException):
+    pass
+
+
 class vJoyFailedToAcquireException(vJoyException):
     pass
 
@@ -0,0 +1,131 @@
+from time import perf_counter_ns
+from typing import Optional
+
+from ..instrumentation import LatencyHistogram
+from . import _sdk
+from .constants import HID_USAGE, JOYSTICK_API_VERSION
+from .exceptions import vJoyException
+from .utils import get_api_version
+from .vjoydevice import VJoyDevice
+
+# axes that can carry the counter, with their field in the data Struct
+_PROBE_FIELDS = {
+    **_sdk.FIELDS_MAP,
+    HID_USAGE.SL0: 'wSlider',
+    HID_USAGE.SL1: 'wDial',
+    HID_USAGE.WHL: 'wWheel',
+}
+
+# counter values, inside the range of every vJoy axis (1 - 0x8000)
+_COUNTER_MIN = 1
+_COUNTER_MAX = 0x8000
+
+
+class LatencyProbe:
+    """
+    Measures the time between `update()` and the moment the driver holds the new data
+
+    A counter is written into an axis nobody reads, the device is updated, then `GetPosition`
+    (vJoy API V3 only) is polled until the counter comes back. Two distributions are recorded:
+    `update`, the duration of the UpdateVJD call (feeder side), and `round_trip`, from before
+    the update until the value is read back.
+
+        with VJoyDevice(1) as device:
+            probe = LatencyProbe(device, axis=HID_USAGE.SL1)
+            probe.run(5000)
+            print(probe.round_trip.to_dict())
+    """
+    __slots__ = ('device', 'axis', 'timeout_ns', 'update', 'round_trip',
+                 'timeouts', '_field', '_readback', '_counter')
+
+    def __init__(self, device: VJoyDevice, axis: HID_USAGE = None, timeout: float = 0.1) -> None:
+        """
+        :param axis: the axis carrying the counter, it must not be used by the application
+            (default: the first axis not configured on the device)
+        :param timeout: seconds to wait for a value before counting the sample as lost
+        """
+        if get_api_version() != JOYSTICK_API_VERSION.V3:
+            raise vJoyException('GetPosition is only available with the vJoy API V3')
+
+        if axis is None:
+            axis = next((hid for hid in _PROBE_FIELDS if hid not in device.available_axis), None)
+            if axis is None:
+                raise ValueError('Every axis is configured on the device, pass the axis to use')
+        elif axis not in _PROBE_FIELDS:
+            raise ValueError(f'{axis!r} cannot carry the counter')
+
+        self.device = device
+        self.axis = axis
+        self.timeout_ns = int(timeout * 1e9)
+        self.update = LatencyHistogram()
+        self.round_trip = LatencyHistogram()
+        self.timeouts = 0
+        self._field = _PROBE_FIELDS[axis]
+        self._readback = type(device._data)()
+        self._counter = _COUNTER_MIN
+
+    def sample(self) -> Optional[int]:
+        """
+        Take a single measure
+
+        :return: the round trip in nanoseconds, None if the value was not read back in time
+        """
+        device = self.device
+        rID = device.rID
+        field = self._field
+        readback = self._readback
+
+        # a different value every time, so the previous one is never mistaken for it
+        value = self._counter
+        self._counter = value + 1 if value < _COUNTER_MAX else _COUNTER_MIN
+
+        with device.locked():
+            setattr(device._data, field, value)
+
+        start = perf_counter_ns()
+        device.update()
+        sent = perf_counter_ns()
+        self.update.record(sent - start)
+
+        deadline = start + self.timeout_ns
+        while True:
+            _sdk.GetPosition(rID, readback)
+            now = perf_counter_ns()
+            if getattr(readback, field) == value:
+                break
+            if now > deadline:
+                self.timeouts += 1
+                return None
+
+        elapsed = now - start
+        self.round_trip.record(elapsed)
+
+        return elapsed
+
+    def run(self, samples: int = 1000, warmup: int = 10) -> LatencyHistogram:
+        """
+        Take `samples` measures, after `warmup` unrecorded ones
+
+        :return: the round trip distribution
+        """
+        for _ in range(warmup):
+            self.sample()
+        self.reset()
+
+        for _ in range(samples):
+            self.sample()
+
+        return self.round_trip
+
+    def reset(self):
+        self.update = LatencyHistogram()
+        self.round_trip = LatencyHistogram()
+        self.timeouts = 0
+
+    def to_dict(self) -> dict:
+        return {
+            'axis': self.axis.name,
+            'timeouts': self.timeouts,
+            'update': self.update.to_dict(),
+            'round_trip': self.round_trip.to_dict(),
+        }
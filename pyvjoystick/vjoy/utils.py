@@ -1,24 +1,37 @@
-import sys
 import warnings
-import winreg
+from functools import lru_cache
 from pathlib import Path
 from platform import architecture
 
 from .constants import ARCH_64, ARCH_86, JOYSTICK_API_VERSION, VJOY_REGISTRY_PATH
+from .exceptions import vJoyNotInstalledException
 
 
 def is64bits() -> bool:
     return '64' in architecture()[0]
 
 
-def get_dll_path() -> str:
+def _open_vjoy_key():
+    # winreg is imported here so the package can be imported on any platform
+    import winreg
+
     access_registry: winreg.HKEYType = winreg.ConnectRegistry(
         None, winreg.HKEY_LOCAL_MACHINE)
     try:
         access_key: winreg.HKEYType = winreg.OpenKey(
             access_registry, VJOY_REGISTRY_PATH)
     except OSError:
-        sys.exit("vJoy does not appear to be installed.Please ensure you have installed vJoy from http://vjoystick.sourceforge.net.")
+        raise vJoyNotInstalledException(
+            "vJoy does not appear to be installed.Please ensure you have installed vJoy from http://vjoystick.sourceforge.net.") from None
+
+    return access_key
+
+
+@lru_cache(maxsize=None)
+def get_dll_path() -> str:
+    import winreg
+
+    access_key = _open_vjoy_key()
 
     install_location: str = winreg.QueryValueEx(
         access_key, 'InstallLocation')[0]
@@ -42,14 +55,11 @@ def get_dll_path() -> str:
     return dll_location
 
 
+@lru_cache(maxsize=None)
 def get_api_version() -> JOYSTICK_API_VERSION:
-    access_registry: winreg.HKEYType = winreg.ConnectRegistry(
-        None, winreg.HKEY_LOCAL_MACHINE)
-    try:
-        access_key: winreg.HKEYType = winreg.OpenKey(
-            access_registry, VJOY_REGISTRY_PATH)
-    except OSError:
-        sys.exit("vJoy does not appear to be installed.Please ensure you have installed vJoy from http://vjoystick.sourceforge.net.")
+    import winreg
+
+    access_key = _open_vjoy_key()
 
     version: str = winreg.QueryValueEx(
         access_key, 'DisplayVersion')[0]
@@ -1,8 +1,19 @@
-from typing import Dict, List
+import threading
+from contextlib import contextmanager
+from ctypes import addressof, memmove, sizeof
+from typing import Dict, List, Sequence
 
+from .. import registry
 from . import _sdk
 from .constants import HID_USAGE
-from .exceptions import vJoyInvalid_rID_Exception
+from .exceptions import (
+    vJoyInvalid_rID_Exception,
+    vJoyInvalidPovIDException,
+    vJoyInvalidPovValueException,
+)
+
+# data Struct fields holding the continuous POV hats, in order
+_CONT_POV_FIELDS = ('bHats', 'bHatsEx1', 'bHatsEx2', 'bHatsEx3')
 
 
 class Limits:
@@ -20,12 +31,17 @@ class Limits:
 class VJoyDevice:
     """Object-oriented API for a vJoy Device"""
     __slots__ = ('rID', '_data', 'available_axis',
-                 'axis_limits', 'number_of_buttons')
+                 'axis_limits', 'number_of_buttons', 'number_of_disc_povs',
+                 'number_of_cont_povs', '_presets',
+                 '_closed', '_lock', '_watchdog', '__weakref__')
 
-    def __init__(self, rID: int = None, data=None):
-        """Constructor"""
+    def __init__(self, rID: int = None, data=None, thread_safe: bool = False):
+        """Constructor, with thread_safe=True the data Struct can be modified from several threads (see locked)"""
 
+        self._closed = True
         self.rID = rID
+        self._presets = {}
+        self._watchdog = None
 
         if rID > _sdk.GetvJoyMaxDevices() or rID <= 0:
             raise vJoyInvalid_rID_Exception
@@ -36,8 +52,13 @@ class VJoyDevice:
             # TODO maybe - have self.data as a wrapper object containing the Struct
             self._data = _sdk.CreateDataStructure(self.rID)
 
+        self._lock = threading.RLock() if thread_safe else None
+
         _sdk.vJoyEnabled()
         _sdk.AcquireVJD(rID)
+        self._closed = False
+        registry.register(self)
+
         _sdk.ResetVJD(rID)
 
         available_axis: List[HID_USAGE] = []
@@ -63,6 +84,8 @@ class VJoyDevice:
         self.available_axis = available_axis
         self.axis_limits = axis_limits
         self.number_of_buttons = _sdk.GetVJDButtonNumber(rID)
+        self.number_of_disc_povs = _sdk.GetVJDDiscPovNumber(rID)
+        self.number_of_cont_povs = _sdk.GetVJDContPovNumber(rID)
 
     def set_button(self, buttonID, state):
         """Set a given button (numbered from 1) to On (1 or True) or Off (0 or False)"""
@@ -78,14 +101,92 @@ class VJoyDevice:
     def set_cont_pov(self, PovID, PovValue):
         return _sdk.SetContPov(PovValue, self.rID, PovID)
 
+    def set_povs(self, values: Sequence[int]):
+        """
+        Set all the POV hats in the data Struct and send it to the device with a single update
+
+        Values are for continuous hats (0 - 35999, hundredths of degree) if the device has any,
+        otherwise for discrete hats (0 - 3). -1 is neutral, as are the hats without a value.
+        The whole data Struct is sent, like `update`: axes and buttons set with the item-at-a-time
+        methods (set_axis, set_button, ...) are reverted to their values in the data Struct.
+        """
+        if self.number_of_cont_povs:
+            count, high = self.number_of_cont_povs, 35999
+        else:
+            count, high = self.number_of_disc_povs, 3
+
+        if len(values) > count:
+            raise vJoyInvalidPovIDException
+        if values and (min(values) < -1 or max(values) > high):
+            raise vJoyInvalidPovValueException
+
+        lock = self._lock
+        if lock is None:
+            self._write_povs(values)
+        else:
+            with lock:
+                self._write_povs(values)
+
+        return self.update()
+
+    def _write_povs(self, values: Sequence[int]):
+        data = self._data
+        if self.number_of_cont_povs:
+            for i, field in enumerate(_CONT_POV_FIELDS):
+                setattr(data, field, values[i] if i < len(values) else -1)
+            return
+
+        # one nibble per hat, the first hat in the lowest one, 0xF is neutral
+        hats = 0xFFFFFFFF
+        for i, value in enumerate(values):
+            hats = (hats & ~(0xF << (4 * i))) | ((value & 0xF) << (4 * i))
+        data.bHats = hats
+
     def reset(self):
         """Reset all axes and buttons to default values"""
 
         return _sdk.ResetVJD(self.rID)
 
     def reset_data(self):
-        """Reset the data Struct to default (does not change vJoy device at all directly)"""
-        self._data = _sdk.CreateDataStructure(self.rID)
+        """Reset the data Struct to default in place (does not change vJoy device at all directly)"""
+        default = _sdk.CreateDataStructure(self.rID)
+        if sizeof(default) != sizeof(self._data):
+            self._data = default
+            return
+
+        self.restore(bytes(default))
+
+    def snapshot(self) -> bytes:
+        """Return a copy of the raw bytes of the data Struct"""
+        lock = self._lock
+        if lock is None:
+            return bytes(self._data)
+
+        with lock:
+            return bytes(self._data)
+
+    def restore(self, data: bytes):
+        """Copy a snapshot back into the data Struct in place (does not change vJoy device at all directly)"""
+        size = sizeof(self._data)
+        if len(data) != size:
+            raise ValueError(
+                f'Expected a snapshot of {size} bytes, but got {len(data)}')
+
+        lock = self._lock
+        if lock is None:
+            memmove(addressof(self._data), data, size)
+            return
+
+        with lock:
+            memmove(addressof(self._data), data, size)
+
+    def save_preset(self, name):
+        """Store a snapshot of the data Struct in a named slot"""
+        self._presets[name] = self.snapshot()
+
+    def load_preset(self, name):
+        """Restore the data Struct from a named slot (see save_preset)"""
+        self.restore(self._presets[name])
 
     def reset_buttons(self):
         """Reset all buttons on the vJoy Device to default"""
@@ -97,12 +198,59 @@ class VJoyDevice:
 
     def update(self):
         """Send the stored Joystick data to the device in one go (the 'efficient' method)"""
-        return _sdk.UpdateVJD(self.rID, self._data)
+        lock = self._lock
+        if lock is None:
+            result = _sdk.UpdateVJD(self.rID, self._data)
+        else:
+            # copy under the lock, send outside of it so writers are not blocked by the driver;
+            # a copy per call, concurrent updates must not overwrite a data Struct being sent
+            with lock:
+                data = self._data.__class__.from_buffer_copy(self._data)
+            result = _sdk.UpdateVJD(self.rID, data)
+
+        if not result and self._watchdog is not None:
+            self._watchdog.update_failed()
+
+        return result
+
+    @property
+    def thread_safe(self) -> bool:
+        return self._lock is not None
+
+    @contextmanager
+    def locked(self):
+        """Hold the device lock while modifying the data Struct, so update never sends it partially modified"""
+        lock = self._lock
+        if lock is None:
+            yield self
+            return
+
+        with lock:
+            yield self
 
     def read_data(self):
         """Read the stored Joystick data to the data structure"""
         return _sdk.GetPosition(self.rID, self._data)
 
+    def close(self):
+        """Relinquish the vJoy Device, calling it more than once has no effect"""
+        if self._closed:
+            return
+
+        self._closed = True
+        registry.unregister(self)
+        _sdk.RelinquishVJD(self.rID)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def __del__(self):
         # free up the controller before losing access
-        _sdk.RelinquishVJD(self.rID)
+        self.close()
@@ -0,0 +1,167 @@
+import threading
+import time
+import weakref
+from typing import Callable, Optional
+
+from . import _sdk
+from .constants import VJD_STATUS
+from .exceptions import vJoyException
+from .vjoydevice import VJoyDevice
+
+
+class WatchdogStats:
+    """Counters of a DeviceWatchdog, times in nanoseconds"""
+    __slots__ = ('update_failures', 'status_checks', 'losses', 'reconnects',
+                 'failed_attempts', 'last_recovery_ns', 'max_recovery_ns')
+
+    def __init__(self) -> None:
+        # UpdateVJD calls that returned FALSE
+        self.update_failures = 0
+        self.status_checks = 0
+        # times the device was found lost (not owned, or updates failing)
+        self.losses = 0
+        # successful recoveries: acquired again and last data pushed
+        self.reconnects = 0
+        # recovery attempts that failed, retried on the next check
+        self.failed_attempts = 0
+        # time between the detection of a loss and the recovery
+        self.last_recovery_ns = 0
+        self.max_recovery_ns = 0
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        values = ', '.join(f'{name}={getattr(self, name)}' for name in self.__slots__)
+        return f'{self.__class__.__name__}< {values} >'
+
+
+class DeviceWatchdog:
+    """
+    Monitors the ownership of a VJoyDevice and acquires it again when it is lost
+
+    The status of the device is checked every `interval` seconds, and a failed `update` wakes
+    the watchdog immediately. When the device is not owned anymore (driver reset, relinquished,
+    ...) it is acquired again and its data Struct is sent, so the device gets back the last
+    known state. A device owned by another application is retried on every check.
+
+        device = VJoyDevice(1)
+        with DeviceWatchdog(device, interval=0.5) as watchdog:
+            ...
+            print(watchdog.stats)
+    """
+
+    def __init__(self, device: VJoyDevice, interval: float = 0.5,
+                 on_lost: Optional[Callable[[VJoyDevice, VJD_STATUS], None]] = None,
+                 on_recovered: Optional[Callable[[VJoyDevice], None]] = None) -> None:
+        """
+        :param interval: seconds between two status checks
+        :param on_lost: called from the watchdog thread with the device and its status when it is lost
+        :param on_recovered: called from the watchdog thread when the device is recovered
+        """
+        if device._watchdog is not None:
+            raise ValueError(f'vJoy device {device.rID} already has a watchdog')
+
+        # the watchdog does not keep the device alive
+        self._device = weakref.ref(device)
+        self._interval = interval
+        self._on_lost = on_lost
+        self._on_recovered = on_recovered
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lost_since: Optional[int] = None
+        self.stats = WatchdogStats()
+
+        device._watchdog = self
+        self._thread = threading.Thread(
+            target=self._run, name=f'{self.__class__.__name__}-{device.rID}', daemon=True)
+        self._thread.start()
+
+    @property
+    def healthy(self) -> bool:
+        """False from the detection of a loss until the device is recovered"""
+        return self._lost_since is None
+
+    def update_failed(self):
+        """Called by VJoyDevice.update when UpdateVJD fails, wakes the watchdog"""
+        self.stats.update_failures += 1
+        self._wake.set()
+
+    def check(self) -> bool:
+        """
+        Check the device now, and try to recover it if it was lost
+
+        :return: True if the device is owned and working
+        """
+        device = self._device()
+        if device is None or device.closed:
+            self._stop.set()
+            return False
+
+        update_failed = self._wake.is_set()
+        self._wake.clear()
+        self.stats.status_checks += 1
+        status = _sdk.GetVJDStatus(device.rID)
+        if status == VJD_STATUS.OWN and not update_failed and self._lost_since is None:
+            return True
+
+        if self._lost_since is None:
+            self._lost_since = time.perf_counter_ns()
+            self.stats.losses += 1
+            if self._on_lost is not None:
+                self._on_lost(device, status)
+
+        if not self._recover(device, status):
+            self.stats.failed_attempts += 1
+            return False
+
+        elapsed = time.perf_counter_ns() - self._lost_since
+        self._lost_since = None
+        self.stats.reconnects += 1
+        self.stats.last_recovery_ns = elapsed
+        self.stats.max_recovery_ns = max(self.stats.max_recovery_ns, elapsed)
+        if self._on_recovered is not None:
+            self._on_recovered(device)
+
+        return True
+
+    def _recover(self, device: VJoyDevice, status: VJD_STATUS) -> bool:
+        rID = device.rID
+        try:
+            if status == VJD_STATUS.OWN:
+                # owned but updates fail, e.g. after a driver reset: take it again
+                _sdk.RelinquishVJD(rID)
+            _sdk.AcquireVJD(rID)
+        except vJoyException:
+            return False
+
+        # the failure flag raised by this update is not a new loss
+        result = device.update()
+        self._wake.clear()
+
+        return bool(result)
+
+    def _run(self):
+        stop = self._stop
+        while not stop.is_set():
+            self._wake.wait(self._interval)
+            if stop.is_set():
+                break
+            self.check()
+
+    def close(self):
+        """Stop monitoring, the device is left as it is"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+
+        device = self._device()
+        if device is not None and device._watchdog is self:
+            device._watchdog = None
+
+    def __enter__(self) -> 'DeviceWatchdog':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
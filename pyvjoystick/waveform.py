@@ -0,0 +1,181 @@
+# Precomputed axis waveforms and clock driven playback, needs numpy.
+#
+# Waveforms are generated in normalized units (-1.0 to 1.0), scaled once to the integer range of
+# the target field, and played back sample by sample on an absolute schedule: sample i is sent at
+# start + i / rate, so timing errors do not accumulate. The time every sample was actually sent
+# is recorded for latency analysis.
+from __future__ import annotations
+
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from .report import get_layout
+from .vjoy import _sdk as vjoy_sdk
+from .vjoy.constants import HID_USAGE
+
+# vJoy axis -> field of the data Struct, FIELDS_MAP plus the sliders and the wheel
+VJOY_AXIS_FIELDS: Dict[HID_USAGE, str] = {
+    **vjoy_sdk.FIELDS_MAP,
+    HID_USAGE.SL0: 'wSlider',
+    HID_USAGE.SL1: 'wDial',
+    HID_USAGE.WHL: 'wWheel',
+}
+
+
+def _times(duration: float, rate: float) -> np.ndarray:
+    return np.arange(int(round(duration * rate))) / rate
+
+
+def sine(duration: float, rate: float, frequency: float, amplitude: float = 1.0,
+         offset: float = 0.0, phase: float = 0.0) -> np.ndarray:
+    """:return: `duration * rate` samples of a sine, in normalized units"""
+    return offset + amplitude * np.sin(2 * np.pi * frequency * _times(duration, rate) + phase)
+
+
+def sweep(duration: float, rate: float, start_frequency: float, end_frequency: float,
+          amplitude: float = 1.0, offset: float = 0.0) -> np.ndarray:
+    """:return: a sine whose frequency goes linearly from start_frequency to end_frequency (chirp)"""
+    t = _times(duration, rate)
+    k = (end_frequency - start_frequency) / duration
+    return offset + amplitude * np.sin(2 * np.pi * (start_frequency * t + k / 2 * t * t))
+
+
+def step(duration: float, rate: float, at: float, low: float = 0.0, high: float = 1.0) -> np.ndarray:
+    """:return: `low` until `at` seconds, then `high`"""
+    return np.where(_times(duration, rate) < at, low, high)
+
+
+def ramp(duration: float, rate: float, start: float = -1.0, end: float = 1.0) -> np.ndarray:
+    """:return: a line from `start` to `end`"""
+    return np.linspace(start, end, int(round(duration * rate)))
+
+
+def scale(wave: np.ndarray, low: int, high: int) -> np.ndarray:
+    """Map normalized values (-1.0 to 1.0) to integers in [low, high], values out of range are clipped"""
+    values = np.rint(low + (np.clip(wave, -1.0, 1.0) + 1.0) * ((high - low) / 2))
+    return values.astype(np.int64)
+
+
+def field_range(report_type, field: str) -> Tuple[int, int]:
+    """:return: the integer range of a report field, e.g. (-32768, 32767) for sThumbLX"""
+    _, fmt = get_layout(report_type).fields[field]
+    bits = fmt.size * 8
+    if fmt.format[-1].islower():
+        return -(1 << (bits - 1)), (1 << (bits - 1)) - 1
+
+    return 0, (1 << bits) - 1
+
+
+class PlaybackResult:
+    """Scheduled and actual send times of every sample, in perf_counter nanoseconds"""
+    __slots__ = ('scheduled', 'sent')
+
+    def __init__(self, scheduled: np.ndarray, sent: np.ndarray) -> None:
+        self.scheduled = scheduled
+        self.sent = sent
+
+    @property
+    def lateness(self) -> np.ndarray:
+        """Nanoseconds between the scheduled time and the end of the update of every sample"""
+        return self.sent - self.scheduled
+
+    def summary(self) -> dict:
+        lateness = self.lateness
+        if len(lateness) == 0:
+            return {'samples': 0}
+
+        p50, p99 = np.percentile(lateness, [50, 99])
+        return {
+            'samples': len(lateness),
+            'mean_ns': float(lateness.mean()),
+            'p50_ns': float(p50),
+            'p99_ns': float(p99),
+            'max_ns': int(lateness.max()),
+        }
+
+
+class Playback:
+    """Plays waveforms on the fields of a device report (VJoyDevice data Struct or VGamepad report)"""
+
+    def __init__(self, device, rate: float, spin: float = 0.002) -> None:
+        """
+        :param rate: samples per second
+        :param spin: the last `spin` seconds before a sample are busy waited instead of slept,
+            sleep is not precise enough on most platforms
+        """
+        self._device = device
+        self._report = getattr(device, '_report', None)
+        if self._report is None:
+            # VJoyDevice
+            self._report = device._data
+        self._rate = rate
+        self._spin_ns = int(spin * 1e9)
+        self._channels: List[Tuple[str, np.ndarray]] = []
+
+    def add(self, field: str, values: np.ndarray) -> Playback:
+        """Play integer values (already in the range of the field) on a report field"""
+        if self._channels and len(values) != len(self._channels[0][1]):
+            raise ValueError('Every waveform of a playback must have the same length')
+
+        if field not in get_layout(type(self._report)).fields:
+            raise ValueError(f'{type(self._report).__name__} has no scalar field {field!r}')
+        self._channels.append((field, np.asarray(values, dtype=np.int64)))
+
+        return self
+
+    def add_wave(self, field: str, wave: np.ndarray) -> Playback:
+        """Play a normalized waveform on a report field, scaled to the range of its type"""
+        return self.add(field, scale(wave, *field_range(type(self._report), field)))
+
+    def add_vjoy_axis(self, axis: HID_USAGE, wave: np.ndarray) -> Playback:
+        """Play a normalized waveform on a vJoy axis, scaled to its axis_limits"""
+        limits = self._device.axis_limits[axis]
+        return self.add(VJOY_AXIS_FIELDS[axis], scale(wave, limits.minValue, limits.maxValue))
+
+    def run(self, start_delay: float = 0.01) -> PlaybackResult:
+        """
+        Play every sample, blocking until the end
+
+        :param start_delay: seconds between the call and the first sample
+        """
+        if not self._channels:
+            return PlaybackResult(np.empty(0, np.int64), np.empty(0, np.int64))
+
+        count = len(self._channels[0][1])
+        report = self._report
+        device = self._device
+        update = device.update
+        lock = getattr(device, '_lock', None)
+        fields = [field for field, _ in self._channels]
+        # rows of python ints, setattr on ctypes fields is faster with them than with numpy scalars
+        rows = np.column_stack([values for _, values in self._channels]).tolist()
+
+        period_ns = 1e9 / self._rate
+        start = time.perf_counter_ns() + int(start_delay * 1e9)
+        scheduled = start + np.rint(np.arange(count) * period_ns).astype(np.int64)
+        sent = np.empty(count, dtype=np.int64)
+        spin_ns = self._spin_ns
+        perf_counter_ns = time.perf_counter_ns
+        sleep = time.sleep
+
+        for i, target in enumerate(scheduled.tolist()):
+            remaining = target - perf_counter_ns()
+            if remaining > spin_ns:
+                sleep((remaining - spin_ns) / 1e9)
+            while perf_counter_ns() < target:
+                pass
+
+            row = rows[i]
+            if lock is None:
+                for field, value in zip(fields, row):
+                    setattr(report, field, value)
+            else:
+                with lock:
+                    for field, value in zip(fields, row):
+                        setattr(report, field, value)
+            update()
+            sent[i] = perf_counter_ns()
+
+        return PlaybackResult(scheduled, sent)